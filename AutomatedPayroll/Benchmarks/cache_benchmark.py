@@ -0,0 +1,115 @@
+"""
+Compares the old pickle-of-dicts cache with the Parquet day partitions.
+
+    python -m Benchmarks.cache_benchmark --factors 1 10 100
+
+Each load runs in its own Python process so the peak RSS of one format does not
+leak into the other. Peak RSS comes from the resource module (Linux/macOS only).
+"""
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from Benchmarks.datasets import project_root, scaled_test_frame
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def write_caches(factor, workdir):
+    from Model import PayrollCache
+
+    df = scaled_test_frame(factor)
+    with open(os.path.join(workdir, "cache.pkl"), "wb") as f:
+        pickle.dump({"date": str(date.today()), "data": df.to_dict(orient="records")}, f)
+    PayrollCache.save_cache(df)
+
+    first_day = min(PayrollCache.cached_days())
+    return {"rows": len(df), "first_day": first_day}
+
+def run_case(case, workdir, first_day=None):
+    """
+    Runs one load inside the child process and returns its timing.
+    """
+    import pandas as pd
+    from Model import PayrollCache
+
+    start = time.perf_counter()
+    if case == "pickle-fresh":
+        with open(os.path.join(workdir, "cache.pkl"), "rb") as f:
+            pickle.load(f).get("date")
+        rows = None
+    elif case == "pickle-load":
+        with open(os.path.join(workdir, "cache.pkl"), "rb") as f:
+            rows = len(pd.DataFrame(pickle.load(f)["data"]))
+    elif case == "parquet-fresh":
+        PayrollCache.is_cache_fresh()
+        rows = None
+    elif case == "parquet-load":
+        rows = len(PayrollCache.load_cache())
+    elif case == "parquet-period":
+        end_day = pd.Timestamp(first_day) + pd.Timedelta(days=6)
+        rows = len(PayrollCache.load_cache(first_day, end_day))
+    else:
+        raise ValueError(f"Unknown case: {case}")
+    seconds = time.perf_counter() - start
+
+    return {"case": case, "seconds": seconds, "rows": rows, "peak_rss_mb": peak_rss_mb()}
+
+def child(args):
+    if args.child == "write":
+        result = write_caches(args.factor, args.workdir)
+    else:
+        result = run_case(args.child, args.workdir, args.first_day)
+    print(json.dumps(result))
+
+def spawn(mode, factor, workdir, first_day=None):
+    env = dict(os.environ, PAYROLL_CACHE_DIR=os.path.join(workdir, "parquet"))
+    cmd = [sys.executable, "-m", "Benchmarks.cache_benchmark", "--child", mode,
+           "--factor", str(factor), "--workdir", workdir]
+    if first_day:
+        cmd += ["--first-day", first_day]
+    out = subprocess.run(cmd, cwd=project_root, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--child")
+    parser.add_argument("--factor", type=int, default=1)
+    parser.add_argument("--workdir")
+    parser.add_argument("--first-day")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    cases = ["pickle-fresh", "parquet-fresh", "pickle-load", "parquet-load", "parquet-period"]
+    print(f"{'factor':>6} {'rows':>9} {'case':<15} {'seconds':>9} {'peak RSS MB':>12}")
+    for factor in args.factors:
+        with tempfile.TemporaryDirectory() as workdir:
+            written = spawn("write", factor, workdir)
+            for case in cases:
+                result = spawn(case, factor, workdir, written["first_day"])
+                rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else "n/a"
+                print(f"{factor:>6} {written['rows']:>9} {case:<15} {result['seconds']:>9.3f} {rss:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Rows/sec of the original row-wise punch_anomaly apply against the compiled anomaly rules.
+
+    python -m Benchmarks.classifier_benchmark --factors 1 10
+
+Also checks that the rules in Model/anomaly_rules.json still label every row of the
+scaled TEST.csv the same way as the original code.
+"""
+import argparse
+import time
+
+from Benchmarks.datasets import scaled_test_frame
+from Model.AnomalyRules import load_rules
+
+
+def reference_punch_anomaly(row):
+    """
+    The original hard-coded row-wise rules, kept here to check the rule engine against.
+    """
+    if row['actual_hours'] == 0:
+        return 'Did not punch in/PTO'
+
+    if (row['earning_code_id'] in [53, 58]) and (126 <= row['cost_center_id'] <= 135):
+        return 'ALS/IFT earning code assigned to 911 cost center'
+
+    if row['discrepancy'] <= -1.5:
+        return 'Clocked out at least 90 minutes early'
+
+    elif row['discrepancy'] >= 10.0:
+        return 'Forgot to clock out for at least 10 hours'
+
+    elif 4.0 <= row['discrepancy'] < 10.0:
+        return 'Shift is at least 4 hours longer than scheduled'
+
+    else:
+        return 'No anomaly'
+
+def best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rules = load_rules()
+
+    print(f"{'rows':>9} {'apply rows/s':>14} {'rules rows/s':>14} {'speedup':>8}")
+    for factor in args.factors:
+        df = scaled_test_frame(factor)
+        apply_time, expected = best_of(args.repeat, lambda: df.apply(reference_punch_anomaly, axis=1))
+        vector_time, labels = best_of(args.repeat, lambda: rules.classify(df))
+
+        mismatches = int((expected.to_numpy() != labels.astype(str)).sum())
+        if mismatches:
+            raise SystemExit(f"{mismatches} rows classified differently at factor {factor}")
+
+        print(f"{len(df):>9} {len(df) / apply_time:>14,.0f} {len(df) / vector_time:>14,.0f} "
+              f"{apply_time / vector_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Cost of comparing pay periods: one dashboard per period against one AnomalyCube over all of them.
+
+    python -m Benchmarks.dashboard_benchmark --factor 10
+
+Runs on TEST.csv scaled factor times, for every complete Sunday-Saturday week in it. Every
+case starts with empty result caches. The cube's dashboards and create_dashboard are checked
+against crosstab_dashboard, the per-row map_division and crosstab code they replaced.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+from Benchmarks.report_benchmark import cold, weekly_periods
+from Model.PayrollAutomation import PayrollAutomation
+from Model.PayrollSchema import enforce_schema
+
+
+def crosstab_dashboard(payroll, start_date, end_date):
+    """
+    The old create_dashboard: map_division on every row, then a crosstab.
+    """
+    df = payroll.filter_24_hours(start_date, end_date)
+    all_anomalies = [
+        'Shift is at least 4 hours longer than scheduled',
+        'Forgot to clock out for at least 10 hours',
+        'Clocked out at least 90 minutes early',
+        'ALS/IFT earning code assigned to 911 cost center',
+        'Did not punch in/PTO'
+    ]
+    all_divisions = list(payroll.Divisions.keys())
+
+    if df is None or df.empty:
+        empty_data = {div: [0]*len(all_anomalies) for div in all_divisions}
+        empty_data['Other'] = [0]*len(all_anomalies)
+        dashboard = pd.DataFrame(empty_data, index=all_anomalies)
+        dashboard['Totals'] = dashboard.sum(axis=1)
+        dashboard.loc['Actual Total'] = dashboard.sum()
+        return dashboard
+
+    # The old code got plain strings and numbers; the cached table is shared, so copy it
+    df = df.assign(anomaly=df['anomaly'].astype(str), cost_center_id=df['cost_center_id'].astype(float))
+
+    def map_division(cc_id):
+        for div, ids in payroll.Divisions.items():
+            if cc_id in ids:
+                return div
+        return 'Unassigned'
+
+    df['division'] = df['cost_center_id'].apply(map_division)
+    summary = pd.crosstab(index=df['anomaly'], columns=df['division'])
+
+    if 'Unassigned' in summary.columns:
+        other_col = summary['Unassigned']
+        summary = summary.drop(columns=['Unassigned'])
+    else:
+        other_col = pd.Series(0, index=summary.index)
+
+    combined_anomalies = summary.index.union(pd.Index(all_anomalies))
+    summary = summary.reindex(index=combined_anomalies, columns=all_divisions, fill_value=0)
+    other_col = other_col.reindex(summary.index, fill_value=0)
+    summary['Other'] = other_col
+    summary['Totals'] = summary.sum(axis=1)
+    summary.loc['Actual Total'] = summary.sum()
+    return summary
+
+def best_of(repeat, payroll, func):
+    best = None
+    for _ in range(repeat):
+        cold(payroll)
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payroll = PayrollAutomation(enforce_schema(scaled_test_frame(args.factor)))
+    periods = weekly_periods(payroll.shift_data_df)
+    print(f"{len(payroll.shift_data_df)} rows, {len(periods)} pay periods")
+
+    crosstab_seconds, expected = best_of(
+        args.repeat, payroll, lambda: [crosstab_dashboard(payroll, *period) for period in periods]
+    )
+    one, _ = best_of(args.repeat, payroll, lambda: payroll.create_dashboard(*periods[0]))
+    each, dashboards = best_of(
+        args.repeat, payroll, lambda: [payroll.create_dashboard(*period) for period in periods]
+    )
+    cube_seconds, cube = best_of(args.repeat, payroll, lambda: payroll.anomaly_cube(periods))
+    trend_seconds, _ = best_of(args.repeat, payroll, lambda: payroll.create_trend(periods))
+
+    for i, old in enumerate(expected):
+        pd.testing.assert_frame_equal(dashboards[i], old)
+        pd.testing.assert_frame_equal(cube.dashboard(i), old)
+
+    print(f"{'case':<34} {'seconds':>8}")
+    print(f"{f'{len(periods)} crosstab dashboards (old)':<34} {crosstab_seconds:>8.3f}")
+    print(f"{'one period dashboard':<34} {one:>8.3f}")
+    print(f"{f'{len(periods)} dashboards, one per period':<34} {each:>8.3f}")
+    print(f"{f'cube over {len(periods)} periods':<34} {cube_seconds:>8.3f}")
+    print(f"{f'trend table over {len(periods)} periods':<34} {trend_seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+import sys
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path so the Model package can be imported
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+TEST_CSV = os.path.join(project_root, "TEST.csv")
+
+# === Synthetic data ===
+# Shapes of the synthetic punches, taken from TEST.csv
+SHIFT_HOURS = {12.0: 0.43, 24.0: 0.21, 8.0: 0.12, 10.0: 0.10, 13.0: 0.05, 8.5: 0.03, 9.0: 0.03, 16.0: 0.03}
+SHIFT_START_HOURS = {7: 0.25, 8: 0.25, 6: 0.12, 9: 0.11, 10: 0.11, 18: 0.05, 19: 0.05, 5: 0.06}
+EARNING_CODES = {1: 0.81, 53: 0.09, 2: 0.036, 21: 0.032, 58: 0.005, 50: 0.005, 70: 0.005, 74: 0.005, 73: 0.004, 54: 0.008}
+# Share of employees on duty on a given day, and of worked days split over two punches
+WORK_RATE = 0.35
+SPLIT_RATE = 0.06
+# Share of punches off their schedule in each anomaly's way (the rest stay within minutes)
+EARLY_RATE = 0.04
+LONG_RATE = 0.01
+FORGOT_RATE = 0.003
+NO_PUNCH_RATE = 0.01
+UNSCHEDULED_RATE = 0.001
+# Cost centers outside every division (they show up as 'Other')
+OTHER_CENTERS = [20, 21, 22, 23, 24, 200, 201]
+# pay_period_id counts Sunday-Saturday weeks from this Sunday
+PAY_PERIOD_EPOCH = date(2017, 1, 1)
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Susan",
+               "William", "Karen", "Richard", "Lisa", "Joseph", "Nancy", "Thomas", "Sandra", "Daniel", "Ashley"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Wilson", "Moore",
+              "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Clark", "Lewis"]
+
+
+def load_test_frame():
+    """
+    Loads TEST.csv with the same column types export() returns.
+    """
+    df = pd.read_csv(TEST_CSV, parse_dates=['scheduled_start', 'scheduled_end'])
+    df['date_line'] = pd.to_datetime(df['date_line']).dt.date
+    if 'cost_center_name' not in df.columns:
+        df.insert(
+            df.columns.get_loc('cost_center_id') + 1, 'cost_center_name',
+            'Cost Center ' + df['cost_center_id'].astype(str)
+        )
+    return df
+
+def scaled_test_frame(factor):
+    """
+    Returns TEST.csv repeated factor times. Every copy gets its own punch ids and
+    employees, and keeps the original dates, so each day grows factor times.
+    """
+    df = load_test_frame()
+    if factor == 1:
+        return df
+
+    id_step = int(df['id'].max()) + 1
+    user_step = int(df['user_id'].max()) + 1
+    copies = []
+    for k in range(factor):
+        copy = df.copy()
+        copy['id'] += k * id_step
+        copy['user_id'] += k * user_step
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+def choose(rng, weights, size):
+    values = np.array(list(weights))
+    p = np.array(list(weights.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=p / p.sum())]
+
+def synthetic_frame(employees=1000, days=28, start=date(2025, 6, 1), seed=0, cost_centers=None):
+    """
+    Returns employees x days of made-up punches with the columns and types of load_test_frame.
+
+    The same seed always gives the same rows. Every employee has a home cost center (from
+    cost_centers, by default every division's plus a few outside them), a usual shift length
+    and start hour, and works on about WORK_RATE of the days; some worked days are split over
+    two punches, and a few punches are off their schedule in each of the anomaly rules' ways.
+    """
+    from Model.PayrollAutomation import PayrollAutomation
+
+    rng = np.random.default_rng(seed)
+    if cost_centers is None:
+        cost_centers = sorted({id for ids in PayrollAutomation.Divisions.values() for id in ids} | set(OTHER_CENTERS))
+
+    # === Employees ===
+    user_ids = np.arange(1, employees + 1) + 1000
+    names = (
+        pd.Series(FIRST_NAMES).sample(employees, replace=True, random_state=seed).to_numpy() + " " +
+        pd.Series(LAST_NAMES).sample(employees, replace=True, random_state=seed + 1).to_numpy()
+    )
+    home_center = rng.choice(np.asarray(cost_centers), size=employees)
+    shift_hours = choose(rng, SHIFT_HOURS, employees).astype(float)
+    start_hour = choose(rng, SHIFT_START_HOURS, employees)
+
+    # === Worked days ===
+    dates = pd.date_range(pd.Timestamp(start), periods=days, freq="D")
+    worked = rng.random((days, employees)) < WORK_RATE
+    day_index, employee = np.nonzero(worked)
+    split = rng.random(len(day_index)) < SPLIT_RATE
+    # Split days get a second punch with the rest of the hours
+    day_index = np.concatenate([day_index, day_index[split]])
+    employee = np.concatenate([employee, employee[split]])
+    part = np.concatenate([np.where(split, 0.5, 1.0), np.full(split.sum(), 0.5)])
+    n = len(day_index)
+
+    date_line = dates[day_index]
+    scheduled_start = date_line + pd.to_timedelta(start_hour[employee], unit="h")
+    scheduled_hours = shift_hours[employee]
+    scheduled_end = scheduled_start + pd.to_timedelta(scheduled_hours, unit="h")
+
+    # === Actual hours ===
+    actual = scheduled_hours * part + rng.normal(0, 0.05, n).round(2)
+    kind = rng.random(n)
+    early = kind < EARLY_RATE
+    long = (kind >= EARLY_RATE) & (kind < EARLY_RATE + LONG_RATE)
+    forgot = (kind >= EARLY_RATE + LONG_RATE) & (kind < EARLY_RATE + LONG_RATE + FORGOT_RATE)
+    no_punch = (kind >= 1 - NO_PUNCH_RATE)
+    actual[early] -= rng.uniform(1.5, 6, early.sum())
+    actual[long] += rng.uniform(4, 10, long.sum())
+    actual[forgot] += rng.uniform(10, 16, forgot.sum())
+    # 24-hour crews mostly book a 12-hour day, which the rules exempt
+    crew_half = (scheduled_hours >= 23) & (rng.random(n) < 0.5)
+    actual[crew_half] = 12.0 + rng.normal(0, 0.05, crew_half.sum()).round(2)
+    actual = np.clip(actual, 0, None).round(2)
+    actual[no_punch] = 0.0
+
+    df = pd.DataFrame({
+        "employee_name": names[employee],
+        "user_id": user_ids[employee],
+        "date_line": date_line,
+        "earning_code_id": choose(rng, EARNING_CODES, n).astype(np.int64),
+        "cost_center_id": home_center[employee].astype(np.int64),
+        "pay_period_id": (date_line - pd.Timestamp(PAY_PERIOD_EPOCH)).days // 7,
+        "actual_hours": actual,
+        "scheduled_start": scheduled_start,
+        "scheduled_end": scheduled_end,
+    })
+    unscheduled = rng.random(n) < UNSCHEDULED_RATE
+    df.loc[unscheduled, ["scheduled_start", "scheduled_end"]] = pd.NaT
+
+    df = df.sort_values(["date_line", "user_id", "actual_hours"], kind="stable").reset_index(drop=True)
+    df.insert(1, "id", np.arange(1, len(df) + 1, dtype=np.int64) + 1000000)
+    df.insert(df.columns.get_loc("cost_center_id") + 1, "cost_center_name", "Cost Center " + df["cost_center_id"].astype(str))
+    df["scheduled_hours"] = (df["scheduled_end"] - df["scheduled_start"]).dt.total_seconds() / 3600
+    df["discrepancy"] = df["actual_hours"] - df["scheduled_hours"]
+    df["date_line"] = df["date_line"].dt.date
+    return df
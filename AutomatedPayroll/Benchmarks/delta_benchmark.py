@@ -0,0 +1,116 @@
+"""
+Delta sync against a full export after edits the day fingerprints must notice.
+
+    python -m Benchmarks.delta_benchmark --employees 300
+
+Runs on synthetic data (datasets.synthetic_frame) covering the rolling window up to today,
+in a SQLite copy of the source tables. After a full export fills the on-disk cache it edits
+the database in ways that leave a day's counts, ids and earliest/latest shift times alone:
+the start of a shift in the middle of its day, the end of another one, and the clock times
+of a punch (moved onto the employee's next shift). Then it syncs with export() and asserts
+the frame equals a full export's, and that the edits did change the data.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+SUITE_DIR = os.path.join(tempfile.gettempdir(), "payroll_delta_benchmark")
+os.environ.setdefault("PAYROLL_CACHE_DIR", os.path.join(SUITE_DIR, "cache"))
+os.environ.setdefault("PAYROLL_TRACE_LOG", "0")
+
+import pandas as pd
+from sqlalchemy import select, update
+
+from Benchmarks.datasets import synthetic_frame
+from Benchmarks.query_benchmark import build_fixture
+from Benchmarks.suite import quiet
+from Model import PayrollSQL
+from Model.PayrollConnection import get_engine
+
+DB_FILE = os.path.join(SUITE_DIR, "payroll_delta_benchmark.db")
+
+
+def middle_shift(day):
+    """
+    Returns a shift of the day that has neither its earliest start nor its latest end.
+    """
+    shifts = PayrollSQL.shifts
+    rows = pd.read_sql(select(shifts).filter(shifts.date_line == day), get_engine())
+    rows = rows[(rows['start_time'] > rows['start_time'].min()) & (rows['end_time'] < rows['end_time'].max())]
+    rows = rows[rows['end_time'] - rows['start_time'] > pd.Timedelta(hours=6)]
+    return rows.iloc[0]
+
+def edit(last_day):
+    """
+    Edits two shifts and a punch; returns the ids of the punches whose hours they change.
+    """
+    shifts, punches = PayrollSQL.shifts, PayrollSQL.timecard_punches
+    engine = get_engine()
+    touched = []
+
+    later_start = middle_shift(last_day - timedelta(days=5))
+    earlier_end = middle_shift(last_day - timedelta(days=8))
+    with engine.begin() as connection:
+        connection.execute(update(shifts).where(shifts.id == int(later_start['id'])).values(
+            start_time=later_start['start_time'] + pd.Timedelta(hours=5)
+        ))
+        connection.execute(update(shifts).where(shifts.id == int(earlier_end['id'])).values(
+            end_time=earlier_end['end_time'] - pd.Timedelta(hours=3)
+        ))
+    for shift in (later_start, earlier_end):
+        found = pd.read_sql(select(punches.id).filter(
+            punches.user_id == int(shift['user_id']), punches.date_line == shift['date_line']
+        ), engine)
+        touched += found['id'].tolist()
+
+    # A punch clocked during the employee's next shift instead of the one on its date
+    day = last_day - timedelta(days=12)
+    candidates = pd.read_sql(select(punches).filter(punches.date_line == day), engine)
+    next_shifts = pd.read_sql(select(shifts).filter(shifts.date_line == day + timedelta(days=1)), engine)
+    punch = candidates.merge(next_shifts, on='user_id', suffixes=('', '_next')).iloc[0]
+    with engine.begin() as connection:
+        connection.execute(update(punches).where(punches.id == int(punch['id'])).values(
+            start_time=punch['start_time_next'], end_time=punch['end_time_next']
+        ))
+    touched.append(int(punch['id']))
+    return touched
+
+def timed_export(**kwargs):
+    started = time.perf_counter()
+    with quiet():
+        df = PayrollSQL.export(**kwargs)
+    return time.perf_counter() - started, df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=300)
+    args = parser.parse_args()
+
+    shutil.rmtree(SUITE_DIR, ignore_errors=True)
+    os.makedirs(SUITE_DIR)
+    last_day = date.today()
+    days = PayrollSQL.LOOKBACK_DAYS + 5
+    df = synthetic_frame(args.employees, days, start=last_day - timedelta(days=days - 1))
+    build_fixture(df, DB_FILE)
+
+    seconds, before = timed_export(incremental=False, sync=True)
+    print(f"{len(df)} punches; full export {seconds:.2f}s, {len(before)} rows in the window")
+
+    touched = edit(last_day)
+    delta_seconds, delta = timed_export(incremental=True, sync=True)
+    full_seconds, full = timed_export(incremental=False, sync=True)
+    print(f"after the edits: delta sync {delta_seconds:.2f}s, full export {full_seconds:.2f}s")
+
+    pd.testing.assert_frame_equal(delta, full)
+    columns = ['scheduled_start', 'scheduled_end', 'scheduled_hours']
+    old = before.set_index('id').loc[touched, columns]
+    new = full.set_index('id').loc[touched, columns]
+    assert not old.equals(new), "the edits did not change any punch"
+    print(f"Delta sync matches the full export, edited punches included ({len(touched)} checked)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+DivisionIndex against the Divisions lookups it replaced: the per-call set scans of
+get_cost_centers and filter_division, and the per-row map_division of the dashboard.
+
+    python -m Benchmarks.division_benchmark --factor 5
+
+Runs on TEST.csv scaled factor times. For every division (plus 'All', 'Other' and an unknown
+name) the cost center dropdown and the rows kept by the division filter are asserted equal to
+the old code's, and so is the division of every cost center id up to the largest one in
+Divisions and a few that are in no division (missing, negative, not whole).
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+from Model.DivisionIndex import DivisionIndex
+from Model.PayrollAutomation import PayrollAutomation
+from Model.PayrollSchema import enforce_schema
+
+DIVISIONS = PayrollAutomation.Divisions
+
+
+# === The old lookups, as they were in PayrollAutomation ===
+def legacy_cost_centers(shift_data_df, division):
+    if shift_data_df is None or shift_data_df.empty:
+        return []
+    unique_centers_df = shift_data_df[['cost_center_id', 'cost_center_name']].dropna().drop_duplicates()
+    all_known_ids = {id for ids in DIVISIONS.values() for id in ids}
+
+    if division == 'All':
+        filtered_df = unique_centers_df
+    elif division == 'Other':
+        filtered_df = unique_centers_df[~unique_centers_df['cost_center_id'].isin(all_known_ids)]
+    else:
+        if division not in DIVISIONS:
+            return []
+        division_ids = set(DIVISIONS[division])
+        filtered_df = unique_centers_df[unique_centers_df['cost_center_id'].isin(division_ids)]
+
+    sorted_centers = filtered_df.sort_values(by='cost_center_name')
+    return list(sorted_centers.itertuples(index=False, name=None))
+
+def legacy_filter_division(df, division):
+    if division == 'All':
+        return df
+    all_known_ids = {id for ids in DIVISIONS.values() for id in ids}
+    if division == 'Other':
+        return df[~df['cost_center_id'].isin(all_known_ids)]
+    return df[df['cost_center_id'].isin(DIVISIONS[division])]
+
+def map_division(cc_id):
+    for div, ids in DIVISIONS.items():
+        if cc_id in ids:
+            return div
+    return 'Unassigned'
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factor", type=int, default=5)
+    args = parser.parse_args()
+
+    df = enforce_schema(scaled_test_frame(args.factor))
+    index = DivisionIndex(DIVISIONS)
+    index_seconds, _ = timed(lambda: index.index_centers(df))
+    print(f"{len(df)} rows, {df['cost_center_id'].nunique()} cost centers; index built in {index_seconds:.3f}s")
+
+    divisions = ['All'] + index.names + ['No such division']
+    legacy_seconds = new_seconds = 0.0
+    for division in divisions:
+        seconds, expected = timed(lambda: legacy_cost_centers(df, division))
+        legacy_seconds += seconds
+        seconds, centers = timed(lambda: index.cost_centers(division))
+        new_seconds += seconds
+        assert centers == expected, f"cost centers of {division} differ"
+
+        if division in DIVISIONS or division == 'Other':
+            expected_ids = legacy_filter_division(df, division)['id']
+            kept_ids = df[index.mask(df['cost_center_id'], division)]['id']
+            pd.testing.assert_series_equal(kept_ids, expected_ids)
+
+    # Every id of every division, the ids between them and a few that fit no division
+    top = max(cc_id for ids in DIVISIONS.values() for cc_id in ids)
+    ids = pd.Series(list(range(top + 5)) + [-1, 2.5, np.nan, 10 ** 6], dtype=float)
+    expected = [map_division(cc_id) for cc_id in ids]
+    expected = ['Other' if division == 'Unassigned' else division for division in expected]
+    assert list(index.assign(ids)) == expected, "division of a cost center id differs from map_division"
+
+    rows = df['cost_center_id']
+    map_seconds, mapped = timed(lambda: rows.apply(map_division))
+    assign_seconds, assigned = timed(lambda: index.assign(rows))
+    assert list(mapped.replace('Unassigned', 'Other')) == list(assigned)
+
+    print(f"{'case':<40} {'seconds':>8}")
+    print(f"{f'Divisions scans, {len(divisions)} dropdowns':<40} {legacy_seconds:>8.4f}")
+    print(f"{f'DivisionIndex, {len(divisions)} dropdowns':<40} {new_seconds:>8.4f}")
+    print(f"{'map_division per row':<40} {map_seconds:>8.4f}")
+    print(f"{'DivisionIndex.assign':<40} {assign_seconds:>8.4f}")
+    print(f"DivisionIndex matches the Divisions lookups for {len(divisions)} divisions and {len(ids)} ids")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Time and file size of each download format, against the old single to_csv call.
+
+    python -m Benchmarks.export_benchmark --rows 100000
+
+Runs on TEST.csv scaled until it has the requested number of rows, with the columns of
+the GUI download. Every format is read back and compared with the frame it was written from.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+from Model.PayrollExport import export_formats, export_path, write_export
+from Model.PayrollReports import REPORT_DROP_COLUMNS
+from Model.PayrollSchema import enforce_schema
+
+
+def read_back(path, fmt):
+    if fmt in ("csv", "csv.gz"):
+        return pd.read_csv(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+def check(df, path, fmt):
+    back = read_back(path, fmt)
+    if len(back) != len(df) or list(back.columns) != list(df.columns):
+        raise AssertionError(f"{fmt}: read back {back.shape}, wrote {df.shape}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--formats", nargs="+", default=export_formats())
+    args = parser.parse_args()
+
+    base = scaled_test_frame(1)
+    factor = -(-args.rows // len(base))
+    df = enforce_schema(scaled_test_frame(factor)).head(args.rows)
+    df = df.drop(columns=REPORT_DROP_COLUMNS, errors="ignore")
+    print(f"{len(df)} rows, {len(df.columns)} columns")
+
+    print(f"{'format':<16} {'seconds':>8} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "to_csv.csv")
+        started = time.perf_counter()
+        df.to_csv(path, index=False)
+        print(f"{'to_csv baseline':<16} {time.perf_counter() - started:>8.2f} {os.path.getsize(path) / 1e6:>8.1f}")
+
+        for fmt in args.formats:
+            path = export_path("anomaly_report", fmt, folder)
+            started = time.perf_counter()
+            write_export(df, path, fmt)
+            seconds = time.perf_counter() - started
+            check(df, path, fmt)
+            print(f"{fmt:<16} {seconds:>8.2f} {os.path.getsize(path) / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Ranges that start before the loaded window, with a gap between a backfill and the window.
+
+    python -m Benchmarks.history_benchmark --employees 300
+
+Runs on synthetic data (datasets.synthetic_frame) in a SQLite copy of the source tables,
+covering --days days up to today. The rolling window is loaded with export(), and the first
+--backfill days are streamed into the on-disk cache with stream_export, so the days between
+them are cached nowhere. A range from the first day into the window must still return every
+row: the rows of get_pay_period and get_anomaly_table are asserted equal to a PayrollAutomation
+loaded with the whole range straight from the database.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+
+SUITE_DIR = os.path.join(tempfile.gettempdir(), "payroll_history_benchmark")
+os.environ.setdefault("PAYROLL_CACHE_DIR", os.path.join(SUITE_DIR, "cache"))
+os.environ.setdefault("PAYROLL_TRACE_LOG", "0")
+
+import pandas as pd
+
+from Benchmarks.datasets import synthetic_frame
+from Benchmarks.query_benchmark import build_fixture
+from Benchmarks.suite import quiet
+from Model import PayrollSQL
+from Model.PayrollAutomation import MIN_DISCREPANCY, PayrollAutomation
+from Model.PayrollCache import uncached_ranges
+
+DB_FILE = os.path.join(SUITE_DIR, "payroll_history_benchmark.db")
+
+
+def same_rows(df, expected, name):
+    """
+    Asserts two row sets hold the same punches with the same values, whatever their order.
+    """
+    df, expected = (
+        frame.sort_values('id').reset_index(drop=True).astype({'employee_name': str, 'cost_center_name': str})
+        for frame in (df, expected)
+    )
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False, check_categorical=False, obj=name)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=300)
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--backfill", type=int, default=31, help="days streamed into the cache")
+    args = parser.parse_args()
+
+    shutil.rmtree(SUITE_DIR, ignore_errors=True)
+    os.makedirs(SUITE_DIR)
+    last_day = date.today()
+    first_day = last_day - timedelta(days=args.days - 1)
+    build_fixture(synthetic_frame(args.employees, args.days, start=first_day), DB_FILE)
+
+    with quiet():
+        PayrollSQL.stream_export(str(first_day), str(first_day + timedelta(days=args.backfill - 1)))
+        payroll = PayrollAutomation()
+    # A range from the first backfilled day to a week into the window
+    start_date = str(first_day)
+    end_date = f"{payroll.window_start + pd.Timedelta(days=6):%Y-%m-%d}"
+    gaps = uncached_ranges(start_date, f"{payroll.window_start - pd.Timedelta(days=1):%Y-%m-%d}")
+    assert gaps, "the backfill reaches the window, there is no gap to test"
+    print(f"range {start_date} to {end_date}; window from {payroll.window_start:%Y-%m-%d}; "
+          f"not cached: {', '.join(f'{first} to {last}' for first, last in gaps)}")
+
+    started = time.perf_counter()
+    with quiet():
+        expected = PayrollAutomation(PayrollSQL.query_period(start_date, end_date))
+    full_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with quiet():
+        rows = payroll.get_pay_period(start_date, end_date)
+    history_seconds = time.perf_counter() - started
+    same_rows(rows, expected.get_pay_period(start_date, end_date), "get_pay_period")
+
+    with quiet():
+        anomalies = payroll.get_anomaly_table(start_date, end_date)
+    expected_anomalies = expected.get_anomaly_table(start_date, end_date)
+    same_rows(anomalies, expected_anomalies, "get_anomaly_table")
+    assert (anomalies['discrepancy'].abs() > MIN_DISCREPANCY).all()
+
+    print(f"whole range from the database {full_seconds:.2f}s; cache, gap query and window {history_seconds:.2f}s")
+    print(f"{len(rows)} rows and {len(anomalies)} anomalies match a load of the whole range")
+
+
+if __name__ == "__main__":
+    main()
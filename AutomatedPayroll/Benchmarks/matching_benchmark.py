@@ -0,0 +1,90 @@
+"""
+Matching punches to scheduled shifts: the old (user_id, date_line) match against
+ShiftMatching.match_shifts, on schedules whose shifts are cut at midnight.
+
+    python -m Benchmarks.matching_benchmark --employees 1000 --days 28
+
+Runs on synthetic data (datasets.synthetic_frame). Its punches get clock times from their
+schedule and actual hours, and every shift that crosses midnight is stored as two rows, one
+per calendar day, as some scheduling systems do. The true schedule is the uncut one, so a
+match is right when it gives the uncut shift's hours. For each way of matching it prints
+the time taken, the wrong matches and the anomaly candidates (more than 1 hour off).
+The interval match is also timed against a join on user_id filtered to the overlaps.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Benchmarks.datasets import synthetic_frame
+from Model.PayrollAutomation import MIN_DISCREPANCY
+from Model.ShiftMatching import day_schedule, match_shifts
+
+
+def cut_at_midnight(shifts):
+    """
+    Stores every shift crossing midnight as two rows, each dated on its own day.
+    """
+    midnight = shifts['start_time'].dt.normalize() + pd.Timedelta(days=1)
+    crossing = shifts['end_time'] > midnight
+    first = shifts.assign(end_time=shifts['end_time'].where(~crossing, midnight))
+    second = shifts[crossing].assign(start_time=midnight[crossing], date_line=midnight[crossing].dt.date)
+    return pd.concat([first, second], ignore_index=True)
+
+def build(employees, days):
+    df = synthetic_frame(employees, days)
+    # Punches start on schedule and last their actual hours; split days' second punch follows the first
+    offset = df.groupby(['user_id', 'date_line']).cumcount().to_numpy() > 0
+    punch_start = df['scheduled_start'] + pd.to_timedelta(np.where(offset, df['scheduled_hours'] / 2, 0), unit='h')
+    punches = df.assign(
+        punch_start=punch_start,
+        punch_end=punch_start + pd.to_timedelta(df['actual_hours'], unit='h')
+    )
+    shifts = df.dropna(subset=['scheduled_start']).drop_duplicates(['user_id', 'date_line'])
+    shifts = pd.DataFrame({
+        'user_id': shifts['user_id'], 'date_line': shifts['date_line'],
+        'start_time': shifts['scheduled_start'], 'end_time': shifts['scheduled_end'],
+    })
+    return punches, cut_at_midnight(shifts)
+
+def overlap_join(punches, shifts):
+    """
+    The straightforward way: every punch joined to every shift of its user, then filtered.
+    """
+    pairs = punches[['user_id', 'punch_start', 'punch_end']].reset_index().merge(shifts, on='user_id')
+    pairs = pairs[(pairs['start_time'] < pairs['punch_end']) & (pairs['end_time'] > pairs['punch_start'])]
+    return len(pairs)
+
+def report(name, seconds, hours, punches):
+    truth = punches['scheduled_hours'].to_numpy()
+    wrong = ~np.isclose(np.nan_to_num(hours, nan=-1.0), np.nan_to_num(truth, nan=-1.0))
+    candidates = (np.abs(punches['actual_hours'].to_numpy() - hours) > MIN_DISCREPANCY).sum()
+    print(f"{name:<26} {seconds:>8.3f} {wrong.sum():>13} {candidates:>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=28)
+    args = parser.parse_args()
+
+    punches, shifts = build(args.employees, args.days)
+    truth_candidates = (punches['discrepancy'].abs() > MIN_DISCREPANCY).sum()
+    print(f"{len(punches)} punches, {len(shifts)} shift rows; {truth_candidates} anomaly candidates on the uncut schedule")
+
+    print(f"{'match':<26} {'seconds':>8} {'wrong hours':>13} {'candidates':>11}")
+    started = time.perf_counter()
+    _, _, day_seconds = day_schedule(punches, shifts)
+    report("user_id, date_line", time.perf_counter() - started, day_seconds / 3600, punches)
+
+    started = time.perf_counter()
+    matched = match_shifts(punches, shifts)
+    report("interval (match_shifts)", time.perf_counter() - started, matched['scheduled_seconds'].to_numpy() / 3600, punches)
+
+    started = time.perf_counter()
+    pairs = overlap_join(punches, shifts)
+    print(f"{'join on user_id + filter':<26} {time.perf_counter() - started:>8.3f}  (pairs only, {pairs} overlaps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Rows pulled and time taken by the period query with the filters pushed down into SQL,
+against pulling the whole range and filtering it in pandas.
+
+    python -m Benchmarks.query_benchmark --factor 5
+
+Runs against a SQLite copy of the scaled TEST.csv (punches, users, shifts and cost centers
+rebuilt from the exported columns), and checks that both paths return the same rows.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+
+from Model import PayrollSQL
+from Model.PayrollAutomation import MIN_DISCREPANCY, PayrollAutomation
+from Model.PayrollConnection import configure, get_engine
+from Model.PayrollSchema import enforce_schema
+
+DB_FILE = os.path.join(tempfile.gettempdir(), "payroll_query_benchmark.db")
+
+
+def build_fixture(df, db_file=DB_FILE):
+    """
+    Writes the exported frame back out as the four source tables, in a SQLite file.
+    """
+    if os.path.exists(db_file):
+        os.remove(db_file)
+    configure(f"sqlite:///{db_file}")
+    PayrollSQL.Base.metadata.create_all(get_engine())
+
+    names = df.drop_duplicates('user_id')
+    first_last = names['employee_name'].str.split(' ', n=1, expand=True)
+    tables = {
+        'users': pd.DataFrame({
+            'user_id': names['user_id'], 'disabled': 'false',
+            'first_name': first_last[0], 'last_name': first_last[1].fillna(''), 'supervisor_id': 1
+        }),
+        'cost_centers': df.drop_duplicates('cost_center_id')[['cost_center_id', 'cost_center_name']]
+            .rename(columns={'cost_center_id': 'id', 'cost_center_name': 'name'}),
+        'payroll_archive_timecard_punches': df[[
+            'id', 'date_line', 'user_id', 'pay_period_id', 'earning_code_id', 'cost_center_id', 'actual_hours'
+        ]].rename(columns={'actual_hours': 'total_hours'}).assign(
+            start_time=df['scheduled_start'], end_time=df['scheduled_end']
+        ),
+    }
+    shifts = df.dropna(subset=['scheduled_start']).drop_duplicates(['user_id', 'date_line'])
+    tables['sched_template_shift_assignments'] = pd.DataFrame({
+        'id': range(1, len(shifts) + 1), 'user_id': shifts['user_id'], 'date_line': shifts['date_line'],
+        'start_time': shifts['scheduled_start'], 'end_time': shifts['scheduled_end'], 'division_id': 1
+    })
+    for name, table in tables.items():
+        table.to_sql(name, get_engine(), if_exists='append', index=False, chunksize=10000)
+
+def in_pandas(start, end, cost_center_ids=None, earning_codes=None):
+    """
+    The old path: pull every punch in the range, then filter in pandas.
+    """
+    df = PayrollSQL.query_days(lambda column: column.between(start, end))
+    if cost_center_ids is not None:
+        df = df[df['cost_center_id'].isin(cost_center_ids)]
+    if earning_codes is not None:
+        df = df[df['earning_code_id'].isin(earning_codes)]
+    df = df[df['discrepancy'].abs() > MIN_DISCREPANCY]
+    return enforce_schema(df.reset_index(drop=True))
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factor", type=int, default=5)
+    args = parser.parse_args()
+
+    df = scaled_test_frame(args.factor)
+    build_fixture(df)
+    start, end = pd.to_datetime(df['date_line']).min().date(), pd.to_datetime(df['date_line']).max().date()
+    print(f"Fixture: {len(df)} punches, {start} to {end}")
+
+    cases = {
+        "whole range": {},
+        "Division 2 cost centers": {'cost_center_ids': PayrollAutomation.Divisions['Division 2']},
+        "ALS/IFT earning codes": {'earning_codes': [53, 58]},
+    }
+    # The pandas path always pulls every punch in the range
+    print(f"{'case':<26} {'pandas s':>9} {'SQL s':>7} {'rows pulled':>12} {'rows sent':>10}")
+    for name, filters in cases.items():
+        pandas_seconds, expected = timed(lambda: in_pandas(start, end, **filters))
+        sql_seconds, result = timed(
+            lambda: PayrollSQL.query_period(start, end, min_discrepancy=MIN_DISCREPANCY, **filters)
+        )
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"{name:<26} {pandas_seconds:>9.3f} {sql_seconds:>7.3f} {len(df):>12} {len(result):>10}")
+
+    print("SQL and pandas paths return the same rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Scaling of the batch report generator with the number of worker processes.
+
+    python -m Benchmarks.report_benchmark --factor 10 --workers 1 2 4 8
+
+Runs on TEST.csv scaled factor times, for every complete Sunday-Saturday pay period in it.
+The baseline is the GUI way of getting the same files: one filter_cost_centers call per
+pay period x division x cost center. Every run writes to a fresh folder, and the files
+written by each worker count are checked against the single-process run.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+from Model.PayrollAutomation import PayrollAutomation
+from Model.PayrollReports import generate_reports, period_dir, safe_name, write_report_csv
+from Model.PayrollSchema import enforce_schema
+
+
+def weekly_periods(df):
+    """
+    Returns the complete Sunday-Saturday weeks covered by the frame.
+    """
+    dates = pd.to_datetime(df['date_line'])
+    # First Sunday on or after the first day
+    start = dates.min() + pd.Timedelta(days=(6 - dates.min().weekday()) % 7)
+    periods = []
+    while start + pd.Timedelta(days=6) <= dates.max():
+        end = start + pd.Timedelta(days=6)
+        periods.append((f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}"))
+        start = end + pd.Timedelta(days=1)
+    return periods
+
+def per_call_reports(payroll, periods, output_dir):
+    """
+    The baseline: every cost center report through its own filter_cost_centers call.
+    """
+    files = 0
+    for start_date, end_date in periods:
+        for division in payroll.division_index.names:
+            folder = os.path.join(period_dir(output_dir, start_date, end_date), safe_name(division))
+            for _, center in payroll.get_cost_centers(division):
+                df = payroll.filter_cost_centers('All', start_date, end_date, division, center)
+                if df is None or df.empty:
+                    continue
+                os.makedirs(folder, exist_ok=True)
+                write_report_csv(df, os.path.join(folder, f"cost_center_{safe_name(center)}.csv"))
+                files += 1
+    return files
+
+def read_tree(folder):
+    contents = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                contents[os.path.relpath(path, folder)] = f.read()
+    return contents
+
+def cold(payroll):
+    # Every run starts without classified periods, as a fresh process would
+    payroll.period_cache.clear()
+    payroll.view_cache.clear()
+    return payroll
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    payroll = PayrollAutomation(enforce_schema(scaled_test_frame(args.factor)))
+    periods = weekly_periods(payroll.shift_data_df)
+    print(f"{len(payroll.shift_data_df)} rows, {len(periods)} pay periods, {os.cpu_count()} CPU(s)")
+
+    print(f"{'mode':<22} {'files':>6} {'seconds':>8} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        started = time.perf_counter()
+        files = per_call_reports(cold(payroll), periods, os.path.join(workdir, "per_call"))
+        print(f"{'per-call baseline':<22} {files:>6} {time.perf_counter() - started:>8.2f} {'':>8}")
+
+        single = None
+        for workers in args.workers:
+            output = os.path.join(workdir, f"workers_{workers}")
+            started = time.perf_counter()
+            files = generate_reports(cold(payroll), periods, 'All', output, workers=workers)
+            seconds = time.perf_counter() - started
+
+            tree = read_tree(output)
+            if single is None:
+                single = (tree, seconds)
+            elif tree != single[0]:
+                raise AssertionError(f"{workers} workers wrote different files than 1 worker")
+            mode = f"{workers} worker(s)"
+            print(f"{mode:<22} {sum(files.values()):>6} {seconds:>8.2f} {single[1] / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Cost of the repeat offender ranking: PayrollAutomation.employee_rollup against a loop that
+counts each pay period on its own and walks the periods of every employee for the streaks.
+
+    python -m Benchmarks.rollup_benchmark --employees 1000 --weeks 52
+
+Runs on synthetic data (datasets.synthetic_frame) held in memory, over the last 5 pay periods
+and over all --weeks of them. The rollup starts from the classified span (the period cache is
+warm, as after the first ranking); the loop asks for each period's table, as a per-period
+report would, and the period cache only holds 8 of them. The loop's counts and streaks are
+checked against the rollup.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from Benchmarks.datasets import synthetic_frame
+from Benchmarks.suite import quiet
+from Model.PayrollAutomation import PayrollAutomation
+from Model.PayrollSchema import enforce_schema
+
+
+def loop_rollup(payroll, periods):
+    """
+    The per-period way: one groupby per period, then the streaks employee by employee.
+    """
+    ordered = sorted(periods)
+    seen = {}
+    for i, (start, end) in enumerate(ordered):
+        df = payroll.filter_24_hours(start, end)
+        if df is None:
+            continue
+        grouped = df.groupby(['user_id', df['anomaly'].astype(str)], observed=True)
+        for (user_id, anomaly), count in grouped.size().items():
+            entry = seen.setdefault((user_id, anomaly), {'count': 0, 'periods': []})
+            entry['count'] += count
+            entry['periods'].append(i)
+
+    rows = []
+    for (user_id, anomaly), entry in seen.items():
+        longest = run = 0
+        previous = None
+        for i in entry['periods']:
+            run = run + 1 if previous is not None and i == previous + 1 else 1
+            longest = max(longest, run)
+            previous = i
+        current = run if previous == len(ordered) - 1 else 0
+        rows.append((user_id, anomaly, entry['count'], len(entry['periods']), longest, current))
+    return pd.DataFrame(rows, columns=['user_id', 'anomaly', 'count', 'periods', 'longest_streak', 'current_streak'])
+
+def best_of(repeat, payroll, func):
+    best = None
+    for _ in range(repeat):
+        payroll.view_cache.clear()
+        started = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+def check(rollup, loop):
+    columns = ['user_id', 'anomaly', 'count', 'periods', 'longest_streak', 'current_streak']
+    left = rollup[columns].astype({'user_id': 'int64'}).sort_values(['user_id', 'anomaly']).reset_index(drop=True)
+    right = loop[columns].astype({'user_id': 'int64'}).sort_values(['user_id', 'anomaly']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(left, right, check_dtype=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Whole Sunday-Saturday weeks, the last one ending last Saturday
+    last = date.today() - timedelta(days=(date.today().weekday() + 2) % 7)
+    first = last - timedelta(days=7 * args.weeks - 1)
+    df = synthetic_frame(args.employees, 7 * args.weeks, start=first)
+    with quiet():
+        payroll = PayrollAutomation(enforce_schema(df))
+    weeks = [
+        (str(first + timedelta(days=7 * k)), str(first + timedelta(days=7 * k + 6)))
+        for k in range(args.weeks)
+    ]
+    print(f"{len(df)} punches, {args.employees} employees, {args.weeks} pay periods from {first}")
+
+    print(f"{'case':<34} {'seconds':>8} {'rows':>6}")
+    for periods in (weeks[-5:], weeks):
+        # Classify the span once, as the first ranking does
+        payroll.employee_rollup(periods)
+        rollup_seconds, rollup = best_of(args.repeat, payroll, lambda: payroll.employee_rollup(periods))
+        loop_seconds, loop = best_of(args.repeat, payroll, lambda: loop_rollup(payroll, periods))
+        check(rollup, loop)
+        print(f"{f'per-period loop, {len(periods)} periods':<34} {loop_seconds:>8.3f} {len(loop):>6}")
+        print(f"{f'employee_rollup, {len(periods)} periods':<34} {rollup_seconds:>8.3f} {len(rollup):>6}")
+
+
+if __name__ == "__main__":
+    main()
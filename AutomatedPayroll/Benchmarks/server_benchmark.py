@@ -0,0 +1,234 @@
+"""
+Simulated supervisors on one server-mode process: many clients searching and downloading
+from the shared data at once, while scheduled refreshes swap in new data.
+
+    python -m Benchmarks.server_benchmark --clients 20 --searches 25 --refreshes 3
+
+Runs on synthetic data (datasets.synthetic_frame) in a SQLite copy of the source tables.
+Every client is a thread with its own selections and last search, driving the same
+run_search and write_report the GUI page calls. Each refresh first adds new punches to the
+database, so the swapped-in data really differs. Afterwards every search result is checked
+against a cold, single-threaded run on the data load it was made on, and every download
+against the client's own last search.
+
+Phase 1 has no refreshes, to show the searches make no database queries at all when every
+pay period is inside the window (as with the defaults). In phase 2 the clients keep searching
+until the data has been refreshed --refreshes times, to show each refresh is one sync however
+many clients there are.
+
+Only the loaded window is pinned to a data load: days before it are read from the disk cache
+and the database on every search (see PayrollAutomation.load_history). Searches of a pay
+period that starts before its load's window are therefore not checked, and counted apart;
+the dashboards of the other periods count only their own days, which come from the load.
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+SUITE_DIR = os.path.join(tempfile.gettempdir(), "payroll_server_benchmark")
+os.environ.setdefault("PAYROLL_CACHE_DIR", os.path.join(SUITE_DIR, "cache"))
+os.environ.setdefault("PAYROLL_TRACE_LOG", "0")
+
+import pandas as pd
+
+from Benchmarks.datasets import synthetic_frame
+from Benchmarks.query_benchmark import build_fixture
+from Benchmarks.suite import quiet
+
+from Model.PayrollAutomation import PayrollAutomation, refresh_shared, shared_payroll
+from Model.PayrollConnection import dispose_engine, get_engine, pool_metrics
+from Viewer.gui import run_search, write_report
+
+DB_FILE = os.path.join(SUITE_DIR, "payroll_server_benchmark.db")
+
+
+def weekly_periods(last):
+    """
+    Returns the pay periods of the simulated clients: the five Sunday-Saturday weeks up to
+    last, as (start, end) date strings.
+    """
+    week_end = last - timedelta(days=(last.weekday() + 2) % 7)
+    return [
+        (str(week_end - timedelta(days=7 * k + 6)), str(week_end - timedelta(days=7 * k)))
+        for k in range(5)
+    ]
+
+def add_punches(df, day, next_id, rows=50):
+    """
+    Appends copies of some punches of a day with new ids, as if they had just been entered.
+    """
+    day_rows = df[pd.to_datetime(df['date_line']).dt.date == day].head(rows)
+    new = day_rows[['date_line', 'user_id', 'pay_period_id', 'earning_code_id', 'cost_center_id', 'actual_hours']]
+    new = new.rename(columns={'actual_hours': 'total_hours'}).assign(
+        id=range(next_id, next_id + len(day_rows)),
+        start_time=day_rows['scheduled_start'], end_time=day_rows['scheduled_end'],
+        # Long enough to be anomalies
+        total_hours=day_rows['actual_hours'] + 5
+    )
+    new.to_sql('payroll_archive_timecard_punches', get_engine(), if_exists='append', index=False)
+    return next_id + len(day_rows)
+
+
+class Client:
+    """
+    One simulated supervisor: its own random selections and its own last search.
+    """
+
+    def __init__(self, number, payroll_options, pay_periods, searches):
+        self.rng = random.Random(number)
+        self.options = payroll_options
+        self.pay_periods = pay_periods
+        self.searches = searches
+        self.last_search = {'key': None, 'df': None, 'payroll': None}
+        self.results = []
+        self.latencies = []
+        self.downloads = []
+
+    def pick(self):
+        division = self.rng.choice(self.options['divisions'])
+        centers = ['All'] + self.options['centers'].get(division, [])
+        return (
+            self.rng.choice(self.options['anomalies']), *self.rng.choice(self.pay_periods),
+            division, self.rng.choice(centers)
+        )
+
+    def run(self, data, folder, until=None):
+        """
+        Makes self.searches searches, or keeps searching until the until event is set.
+        """
+        i = 0
+        while (i < self.searches) if until is None else not until.is_set():
+            i += 1
+            key = self.pick()
+            payroll = data['payroll']
+            started = time.perf_counter()
+            df, dashboard, trend = run_search(payroll, self.pay_periods, *key)
+            self.latencies.append(time.perf_counter() - started)
+            self.last_search.update({'key': key + (False,), 'df': df, 'payroll': payroll})
+            self.results.append((payroll, key, df, dashboard))
+
+            # Every fifth search is followed by a download of the same view
+            if i % 5 == 0:
+                path = write_report(payroll, self.last_search, *key, 'csv', folder=os.path.join(folder, str(id(self))))
+                # Read back now: the next download of the same period reuses the file name
+                written = len(pd.read_csv(path)) if path is not None else 0
+                self.downloads.append((0 if df is None else len(df), written))
+
+def check(clients, pay_periods):
+    """
+    Compares every result with a cold, single-threaded run on the same data load, except
+    the searches of pay periods starting before the load's window.
+    Returns the number of results checked and the number skipped.
+    """
+    reference = {}
+    checked = skipped = 0
+    for client in clients:
+        for payroll, key, df, dashboard in client.results:
+            if pd.Timestamp(key[1]) < payroll.window_start:
+                skipped += 1
+                continue
+            if id(payroll) not in reference:
+                reference[id(payroll)] = PayrollAutomation(payroll.shift_data_df.copy())
+            expected_df, expected_dashboard, _ = run_search(reference[id(payroll)], pay_periods, *key)
+            if (df is None) != (expected_df is None) or (df is not None and not df['id'].equals(expected_df['id'])):
+                raise AssertionError(f"Search {key} returned different rows than a single-threaded run")
+            pd.testing.assert_frame_equal(dashboard, expected_dashboard)
+            checked += 1
+
+        for rows, written in client.downloads:
+            if rows != written:
+                raise AssertionError(f"A download of client {id(client)} does not match its own last search")
+    return checked, skipped
+
+def run_clients(data, options, pay_periods, args, folder, refreshes_wanted=0):
+    """
+    Runs every client in its own thread. With refreshes_wanted, the data is refreshed every
+    --refresh-seconds meanwhile, and the clients stop after that many refreshes.
+    """
+    clients = [Client(number, options, pay_periods, args.searches) for number in range(args.clients)]
+    done = threading.Event() if refreshes_wanted else None
+    threads = [threading.Thread(target=client.run, args=(data, folder, done)) for client in clients]
+    threads_refresh = []
+    refreshes = []
+
+    def refresher():
+        next_id = 10_000_000
+        while len(refreshes) < refreshes_wanted:
+            time.sleep(args.refresh_seconds)
+            next_id = add_punches(data['frame'], data['last_day'], next_id)
+            started = time.perf_counter()
+            with quiet():
+                data['payroll'] = refresh_shared()
+            refreshes.append(time.perf_counter() - started)
+        # One more round of searches on the last load before stopping
+        time.sleep(args.refresh_seconds)
+        done.set()
+
+    if refreshes_wanted:
+        threads_refresh.append(threading.Thread(target=refresher))
+    started = time.perf_counter()
+    for thread in threads_refresh + threads:
+        thread.start()
+    for thread in threads_refresh + threads:
+        thread.join()
+    return clients, time.perf_counter() - started, refreshes
+
+def report(name, clients, seconds, refreshes, checkouts):
+    latencies = sorted(latency for client in clients for latency in client.latencies)
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    print(f"{name}: {len(latencies)} searches by {len(clients)} clients in {seconds:.1f}s "
+          f"({len(latencies) / seconds:.0f}/s), median {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {p95 * 1000:.1f} ms")
+    print(f"  data loads: {len(refreshes)} refresh(es)"
+          + (f", {statistics.median(refreshes):.2f}s each" if refreshes else "")
+          + f"; database checkouts: {checkouts}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--searches", type=int, default=25, help="searches per client and phase")
+    parser.add_argument("--refreshes", type=int, default=3, help="data refreshes in phase 2")
+    parser.add_argument("--refresh-seconds", type=float, default=1.0)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=35)
+    args = parser.parse_args()
+
+    shutil.rmtree(SUITE_DIR, ignore_errors=True)
+    os.makedirs(SUITE_DIR)
+    last_day = date.today() - timedelta(days=1)
+    df = synthetic_frame(args.employees, args.days, start=last_day - timedelta(days=args.days - 1))
+    build_fixture(df, DB_FILE)
+
+    with quiet():
+        payroll = shared_payroll()
+    data = {'payroll': payroll, 'frame': df, 'last_day': last_day}
+    pay_periods = weekly_periods(last_day)
+    options = {
+        'anomalies': ['All'] + payroll.anomalies,
+        'divisions': ['All'] + payroll.division_index.names,
+        'centers': {
+            division: [name for _, name in payroll.get_cost_centers(division)][:5]
+            for division in payroll.division_index.names
+        },
+    }
+    print(f"{len(df)} punches, {args.clients} clients, pay periods {pay_periods[-1][0]} to {pay_periods[0][1]}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for name, refreshes_wanted in (("phase 1, no refresh", 0), ("phase 2, scheduled refresh", args.refreshes)):
+            before = pool_metrics()['checkouts']
+            clients, seconds, refreshes = run_clients(data, options, pay_periods, args, folder, refreshes_wanted)
+            report(name, clients, seconds, refreshes, pool_metrics()['checkouts'] - before)
+            checked, skipped = check(clients, pay_periods)
+            print(f"  {checked} results match single-threaded runs on their data load"
+                  + (f" ({skipped} of pay periods before the window not checked)" if skipped else ""))
+    dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
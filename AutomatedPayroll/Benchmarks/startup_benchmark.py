@@ -0,0 +1,77 @@
+"""
+Cold start cost of the GUI: the time to import Viewer/gui.py, which is what runs before the
+window can open, and the heavy libraries loaded by then.
+
+    python -m Benchmarks.startup_benchmark --repeat 5
+    python -m Benchmarks.startup_benchmark --log ~/.cache/AutomatedPayroll/profiles/startup.jsonl
+
+Every run is a fresh Python process, so nothing is already imported. --log summarizes the
+startup.jsonl the app writes on every launch with PAYROLL_TRACE_LOG=1 (time to window, data
+and first search), to compare releases.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from Benchmarks.datasets import project_root
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "sqlalchemy", "openpyxl", "xlsxwriter"]
+
+# Imports the GUI without starting the server
+GUI_SCRIPT = f"""
+import runpy, sys, time
+started = time.perf_counter()
+runpy.run_path({os.path.join(project_root, 'Viewer', 'gui.py')!r}, run_name='startup_check')
+seconds = time.perf_counter() - started
+print(seconds, ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules), sep='|')
+"""
+
+# What load_payroll imports in the background
+DATA_SCRIPT = """
+import time
+started = time.perf_counter()
+import Model.PayrollAutomation, Model.PayrollExport
+print(time.perf_counter() - started, '', sep='|')
+"""
+
+
+def run_script(script):
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=project_root, capture_output=True, text=True, check=True,
+        env=dict(os.environ, PAYROLL_TRACE_LOG="0")
+    )
+    seconds, modules = result.stdout.strip().splitlines()[-1].split("|")
+    return float(seconds), modules
+
+def summarize_log(path):
+    with open(path, encoding="utf-8") as f:
+        launches = [json.loads(line) for line in f if line.strip()]
+    print(f"{len(launches)} launch(es) in {path}, last {launches[-1]['date'] if launches else '-'}")
+    print(f"{'mark':<14} {'median s':>9} {'last s':>7}")
+    for name in ("imports", "window", "data", "first_search"):
+        values = [launch[name] for launch in launches if name in launch]
+        if values:
+            print(f"{name:<14} {statistics.median(values):>9.2f} {values[-1]:>7.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--log", help="startup.jsonl written by the app")
+    args = parser.parse_args()
+
+    if args.log:
+        summarize_log(args.log)
+        return
+
+    print(f"{'step':<30} {'median s':>9} {'min s':>7}  heavy modules loaded")
+    for name, script in (("gui import", GUI_SCRIPT), ("data modules (background)", DATA_SCRIPT)):
+        runs = [run_script(script) for _ in range(args.repeat)]
+        times = [seconds for seconds, _ in runs]
+        print(f"{name:<30} {statistics.median(times):>9.2f} {min(times):>7.2f}  {runs[-1][1] or '-'}")
+
+
+if __name__ == "__main__":
+    main()
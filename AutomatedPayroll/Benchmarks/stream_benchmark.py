@@ -0,0 +1,89 @@
+"""
+Peak memory of pulling a long range in one read_sql call against the streaming export.
+
+    python -m Benchmarks.stream_benchmark --factors 2 8 --chunksize 20000
+
+Builds the SQLite fixture from Benchmarks.query_benchmark for each factor, then runs each
+mode in its own Python process so one mode's peak RSS does not leak into the other. The
+fixture is built in a child process too: Linux carries the parent's peak RSS into the child.
+Peak RSS comes from the resource module (Linux/macOS only).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from Benchmarks.cache_benchmark import peak_rss_mb
+from Benchmarks.datasets import project_root, scaled_test_frame
+from Benchmarks.query_benchmark import DB_FILE, build_fixture
+
+START, END = "2025-01-01", "2025-12-31"
+
+
+def run_case(case, chunksize):
+    """
+    Runs one export inside the child process and returns its timing.
+    """
+    import pandas as pd
+    from Model import PayrollSQL
+    from Model.PayrollConnection import configure
+    from Model.PayrollSchema import enforce_schema
+
+    configure(f"sqlite:///{DB_FILE}")
+    start = time.perf_counter()
+    if case == "read_sql":
+        # The old path: one frame for the whole range, then a cache write
+        day_filter = lambda column: column.between(pd.Timestamp(START).date(), pd.Timestamp(END).date())
+        df = enforce_schema(PayrollSQL.query_days(day_filter))
+        PayrollSQL.save_cache(df)
+        rows = len(df)
+    elif case == "stream":
+        rows = PayrollSQL.stream_export(START, END, chunksize=chunksize)["rows"]
+    else:
+        raise ValueError(f"Unknown case: {case}")
+    seconds = time.perf_counter() - start
+
+    return {"case": case, "seconds": seconds, "rows": rows, "peak_rss_mb": peak_rss_mb()}
+
+def child(args):
+    if args.child == "fixture":
+        build_fixture(scaled_test_frame(args.factor))
+        result = {}
+    else:
+        result = run_case(args.child, args.chunksize)
+    print(json.dumps(result))
+
+def spawn(case, factor, chunksize, workdir):
+    env = dict(os.environ, PAYROLL_CACHE_DIR=os.path.join(workdir, case))
+    cmd = [sys.executable, "-m", "Benchmarks.stream_benchmark", "--child", case,
+           "--factor", str(factor), "--chunksize", str(chunksize)]
+    out = subprocess.run(cmd, cwd=project_root, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--factors", type=int, nargs="+", default=[2, 8])
+    parser.add_argument("--chunksize", type=int, default=20000)
+    parser.add_argument("--child")
+    parser.add_argument("--factor", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    print(f"{'factor':>6} {'rows':>9} {'case':<9} {'seconds':>9} {'peak RSS MB':>12}")
+    for factor in args.factors:
+        with tempfile.TemporaryDirectory() as workdir:
+            spawn("fixture", factor, args.chunksize, workdir)
+            for case in ["read_sql", "stream"]:
+                result = spawn(case, factor, args.chunksize, workdir)
+                rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else "n/a"
+                print(f"{factor:>6} {result['rows']:>9} {case:<9} {result['seconds']:>9.2f} {rss:>12}")
+
+
+if __name__ == "__main__":
+    main()
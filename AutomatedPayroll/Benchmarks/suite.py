@@ -0,0 +1,209 @@
+"""
+Regression suite over synthetic payroll data: times every pipeline step and compares the
+results with a saved baseline.
+
+    python -m Benchmarks.suite --employees 1000 --days 28 --save baseline.json
+    python -m Benchmarks.suite --employees 1000 --days 28 --compare baseline.json
+
+The data comes from datasets.synthetic_frame with a fixed seed, so runs with the same
+arguments time the same rows, dated to end yesterday. It is loaded into a SQLite copy of
+the source tables, which export() reads like the live database. Each benchmark is a time_*
+function; its setup_* function (if any) runs untimed before every repeat. The exit code
+is 1 when any benchmark is slower than its baseline by more than --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Benchmark runs get their own disk cache, and no trace log (see PayrollProfiler)
+SUITE_DIR = os.path.join(tempfile.gettempdir(), "payroll_suite")
+os.environ.setdefault("PAYROLL_CACHE_DIR", os.path.join(SUITE_DIR, "cache"))
+os.environ.setdefault("PAYROLL_TRACE_LOG", "0")
+
+import pandas as pd
+
+from Benchmarks.datasets import synthetic_frame
+from Benchmarks.query_benchmark import build_fixture
+
+from Model import PayrollCache, PayrollSQL
+from Model.PayrollAutomation import PayrollAutomation
+from Model.PayrollConnection import dispose_engine
+
+DB_FILE = os.path.join(SUITE_DIR, "payroll_suite.db")
+# Slowdowns smaller than this are timer noise, whatever the ratio
+NOISE_SECONDS = 0.001
+
+
+# === Setup ===
+def clear_disk_cache(data):
+    shutil.rmtree(PayrollCache.CACHE_DIR, ignore_errors=True)
+
+def stale_disk_cache(data):
+    # As on the day after the last sync, so export() takes the delta path
+    meta = PayrollCache.read_cache_meta()
+    meta["date"] = str(date.today() - timedelta(days=1))
+    PayrollCache.write_cache_meta(meta)
+
+def cold_results(data):
+    data["payroll"].period_cache.clear()
+    data["payroll"].view_cache.clear()
+
+setup_export_full = clear_disk_cache
+setup_export_delta = stale_disk_cache
+setup_get_anomaly_table = cold_results
+setup_filter_cost_centers = cold_results
+setup_create_dashboard = cold_results
+
+
+# === Benchmarks ===
+def time_export_full(data):
+    PayrollSQL.export(incremental=False)
+
+def time_export_delta(data):
+    PayrollSQL.export(incremental=True)
+
+def time_cache_load(data):
+    PayrollCache.load_cache(data["cutoff"])
+
+def time_get_anomaly_table(data):
+    data["payroll"].get_anomaly_table(*data["week"])
+
+def time_filter_cost_centers(data):
+    data["payroll"].filter_cost_centers("All", *data["week"], "Division 2", "All")
+
+def time_filter_cost_centers_cached(data):
+    data["payroll"].filter_cost_centers("All", *data["week"], "Division 2", "All")
+
+def time_create_dashboard(data):
+    data["payroll"].create_dashboard(*data["week"])
+
+def time_get_cost_centers(data):
+    data["payroll"].get_cost_centers("Division 2")
+
+BENCHMARKS = [name for name in list(globals()) if name.startswith("time_")]
+
+
+# === Runner ===
+def prepare(args):
+    """
+    Builds the synthetic data, the SQLite source tables and the disk cache.
+    Returns the state handed to every benchmark.
+    """
+    os.makedirs(SUITE_DIR, exist_ok=True)
+    start = date.today() - timedelta(days=args.days)
+    df = synthetic_frame(args.employees, args.days, start=start, seed=args.seed)
+    print(f"{len(df)} punches, {args.employees} employees x {args.days} days from {start}, seed {args.seed}")
+    print(f"Data fingerprint: {pd.util.hash_pandas_object(df, index=False).sum() & 0xffffffff:08x}")
+
+    build_fixture(df, DB_FILE)
+    clear_disk_cache(None)
+    with quiet():
+        payroll = PayrollAutomation(PayrollSQL.export(incremental=False))
+
+    # Latest Sunday-Saturday week fully inside the data
+    last = date.today() - timedelta(days=1)
+    week_end = last - timedelta(days=(last.weekday() + 2) % 7)
+    week = (str(week_end - timedelta(days=6)), str(week_end))
+    payroll.filter_cost_centers("All", *week, "Division 2", "All")
+    return {"payroll": payroll, "week": week, "cutoff": start}
+
+def quiet():
+    # The pipeline prints its progress; it would bury the results
+    return contextlib.redirect_stdout(io.StringIO())
+
+def run(name, data, repeat):
+    """
+    Returns the times of repeat runs of one benchmark, in seconds.
+    """
+    func = globals()[name]
+    setup = globals().get("setup_" + name[len("time_"):])
+    times = []
+    for _ in range(repeat):
+        with quiet():
+            if setup is not None:
+                setup(data)
+            started = time.perf_counter()
+            func(data)
+            times.append(time.perf_counter() - started)
+    return times
+
+def compare(results, baseline, threshold):
+    """
+    Prints every benchmark next to its baseline. Returns the names that regressed.
+    """
+    regressed = []
+    print(f"{'benchmark':<34} {'baseline ms':>12} {'now ms':>9} {'ratio':>7}")
+    for name, seconds in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<34} {'-':>12} {seconds * 1000:>9.2f} {'new':>7}")
+            continue
+        ratio = seconds / before
+        flag = ""
+        if ratio > threshold and seconds - before > NOISE_SECONDS:
+            flag = "  SLOWER"
+            regressed.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<34} {before * 1000:>12.2f} {seconds * 1000:>9.2f} {ratio:>6.2f}x{flag}")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=28)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--bench", nargs="+", default=BENCHMARKS, help="time_* functions to run")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file written by --save")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    if args.days > PayrollSQL.LOOKBACK_DAYS:
+        parser.error(f"--days can be at most {PayrollSQL.LOOKBACK_DAYS}, the window export() pulls")
+
+    data = prepare(args)
+    results = {}
+    print(f"{'benchmark':<34} {'median ms':>10} {'min ms':>8}")
+    for name in args.bench:
+        times = run(name, data, args.repeat)
+        # The median: single fast or slow outliers don't move it
+        results[name] = statistics.median(times)
+        print(f"{name:<34} {results[name] * 1000:>10.2f} {min(times) * 1000:>8.2f}")
+    dispose_engine()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "employees": args.employees, "days": args.days, "seed": args.seed, "repeat": args.repeat,
+                    "python": platform.python_version(), "pandas": pd.__version__, "date": str(date.today()),
+                },
+                "results": results,
+            }, f, indent=4)
+        print(f"Results saved at: {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        meta = baseline.get("meta", {})
+        if (meta.get("employees"), meta.get("days"), meta.get("seed")) != (args.employees, args.days, args.seed):
+            print(f"Warning: the baseline was run on different data ({meta})")
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"{len(regressed)} benchmark(s) slower than the baseline by more than {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Server-side cost of showing the anomaly table: the old ui.table.from_pandas path
+(every row serialized to JSON) against one page from the TablePager.
+
+    python -m Benchmarks.table_benchmark --rows 1000 10000 100000
+
+Browser rendering is not measured here; the payload size column shows how much
+JSON each approach pushes over the websocket.
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from Benchmarks.datasets import scaled_test_frame
+from Model.AnomalyRules import load_rules
+from Model.PayrollSchema import enforce_schema
+from Viewer.TablePager import TablePager
+
+DISPLAY_DROP = ['earning_code_id', 'discrepancy', 'scheduled_start', 'scheduled_end']
+
+
+def anomaly_rows(count):
+    """
+    Returns count classified rows shaped like the GUI's anomaly table.
+    """
+    factor = max(1, -(-count // 23000))
+    df = enforce_schema(scaled_test_frame(factor)).head(count)
+    df = df.assign(anomaly=load_rules().classify(df))
+    return df.drop(columns=DISPLAY_DROP)
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def full_payload(df):
+    # What ui.table.from_pandas sends: every row, every column
+    rows = TablePager(df).to_rows(df)
+    return json.dumps(rows)
+
+def page_payload(pager, **kwargs):
+    rows, total = pager.page(**kwargs)
+    return json.dumps({'rows': rows, 'rowsNumber': total})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rows-per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'case':<22} {'seconds':>9} {'payload KB':>11}")
+    for count in args.rows:
+        df = anomaly_rows(count)
+        pager = TablePager(df, hidden=['id'])
+        cases = [
+            ("full table", lambda: full_payload(df)),
+            ("first page", lambda: page_payload(pager, page=1, rows_per_page=args.rows_per_page)),
+            ("sorted page", lambda: page_payload(pager, page=3, rows_per_page=args.rows_per_page,
+                                                 sort_by='actual_hours', descending=True)),
+            ("filtered page", lambda: page_payload(pager, page=1, rows_per_page=args.rows_per_page,
+                                                   filters={'employee_name': 'an'})),
+        ]
+        for name, case in cases:
+            seconds, payload = timed(case)
+            print(f"{len(df):>8} {name:<22} {seconds:>9.4f} {len(payload) / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    pd.set_option('display.width', 120)
+    main()
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+
+class AnomalyCube:
+    """
+    Anomaly x division counts for one or more pay periods, from a single classified frame.
+
+    The frame is the anomaly table of the whole span the periods cover, sorted by date_line.
+    Anomaly and division codes are computed once for all rows; each period is then the block
+    of rows between two binary searches, counted with one np.bincount. Periods may overlap.
+    """
+
+    def __init__(self, df, periods, labels, division_index):
+        self.periods = [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in periods]
+        self.labels = list(labels)
+        self.division_index = division_index
+        self.divisions = division_index.names
+
+        shape = (len(self.labels), len(self.divisions))
+        self.counts = np.zeros((len(self.periods),) + shape, dtype=np.int64)
+        # Periods without any anomaly rows get the empty dashboard layout
+        self.has_rows = np.zeros(len(self.periods), dtype=bool)
+        if df is None or df.empty:
+            return
+
+        anomaly = df['anomaly']
+        if isinstance(anomaly.dtype, pd.CategoricalDtype):
+            # Recodes the few categories instead of comparing every row's string
+            anomaly_codes = anomaly.cat.set_categories(self.labels).cat.codes.to_numpy()
+        else:
+            anomaly_codes = pd.Categorical(anomaly.astype(str), categories=self.labels).codes
+        division_codes = division_index.division_codes(df['cost_center_id'])
+        cells = anomaly_codes.astype(np.int64) * len(self.divisions) + division_codes
+        # Labels outside the rules (code -1) are not counted
+        cells[anomaly_codes < 0] = -1
+
+        dates = df['date_line'].to_numpy()
+        for i, (start, end) in enumerate(self.periods):
+            lo = np.searchsorted(dates, start.to_datetime64(), side='left')
+            hi = np.searchsorted(dates, end.to_datetime64(), side='right')
+            period_cells = cells[lo:hi]
+            self.has_rows[i] = hi > lo
+            self.counts[i] = np.bincount(
+                period_cells[period_cells >= 0], minlength=shape[0] * shape[1]
+            ).reshape(shape)
+
+    def period_label(self, i):
+        start, end = self.periods[i]
+        return f"{start:%Y-%m-%d} - {end:%Y-%m-%d}"
+
+    def dashboard(self, i=0):
+        """
+        Returns the create_dashboard table of one period: anomalies x divisions (plus 'Other'),
+        with a 'Totals' column and an 'Actual Total' row.
+        """
+        if not self.has_rows[i]:
+            # Same layout as before the engine: rule file order, no axis names
+            dashboard = pd.DataFrame(0, index=self.labels, columns=self.divisions, dtype=np.int64)
+        else:
+            order = np.argsort(self.labels, kind='stable')
+            dashboard = pd.DataFrame(
+                self.counts[i][order],
+                index=[self.labels[k] for k in order],
+                columns=pd.Index(self.divisions, name='division')
+            )
+
+        dashboard['Totals'] = dashboard.sum(axis=1)
+        dashboard.loc['Actual Total'] = dashboard.sum()
+        return dashboard
+
+    def trend(self, division='All'):
+        """
+        Returns anomalies x pay periods counts for all divisions or one division (or 'Other'),
+        with an 'Actual Total' row. Columns are the periods, in the order they were given.
+        """
+        if division == 'All':
+            counts = self.counts.sum(axis=2)
+        else:
+            counts = self.counts[:, :, self.divisions.index(division)]
+
+        trend = pd.DataFrame(
+            counts.T, index=self.labels,
+            columns=[self.period_label(i) for i in range(len(self.periods))]
+        )
+        trend.loc['Actual Total'] = trend.sum()
+        return trend
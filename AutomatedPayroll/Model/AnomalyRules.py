@@ -0,0 +1,139 @@
+import json
+import operator
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Default rules ship next to this module (bundled with the Model folder by PyInstaller).
+# Ops can point PAYROLL_ANOMALY_RULES at their own copy to add or tune rules.
+RULES_FILE = os.environ.get(
+    "PAYROLL_ANOMALY_RULES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "anomaly_rules.json")
+)
+
+# Comparison operators a condition can use. Each takes the column values and the
+# condition value and returns a boolean mask.
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda values, value: np.isin(values, value),
+    "not in": lambda values, value: ~np.isin(values, value),
+    "between": lambda values, value: (values >= value[0]) & (values <= value[1]),
+}
+
+
+class AnomalyRules:
+    """
+    Anomaly rules defined as data and compiled once into vectorized masks.
+
+    Each rule has a label, a priority (lower is checked first) and a list of conditions
+    that must all hold. A row gets the label of the first rule it matches by priority,
+    or the default label. Exemptions drop rows after classification, unless the row has
+    one of the labels listed under "unless".
+    """
+
+    def __init__(self, config):
+        self.default_label = config.get("default_label", "No anomaly")
+        rules = config["rules"]
+
+        # Labels in the order they are listed, used for dropdowns and dashboards
+        self.labels = [rule["label"] for rule in rules]
+        self.categories = self.labels + [self.default_label]
+
+        by_priority = sorted(rules, key=lambda rule: rule["priority"])
+        self.rules = [(rule["label"], self.compile(rule["when"], rule["label"])) for rule in by_priority]
+        self.exemptions = [
+            (exemption.get("name", "exemption"),
+             self.compile(exemption["when"], exemption.get("name", "exemption")),
+             list(exemption.get("unless", [])))
+            for exemption in config.get("exemptions", [])
+        ]
+
+    @classmethod
+    def from_file(cls, path=RULES_FILE):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def compile(self, conditions, name):
+        """
+        Turns a list of condition dicts into (key, column, op, value) tuples. The key lets
+        identical conditions shared between rules be evaluated only once per frame.
+        """
+        compiled = []
+        for condition in conditions:
+            op = condition["op"]
+            if op not in OPERATORS:
+                raise ValueError(f"Rule '{name}': unknown operator '{op}'")
+            if op == "between" and len(condition["value"]) != 2:
+                raise ValueError(f"Rule '{name}': 'between' needs [low, high]")
+            key = (condition["column"], op, json.dumps(condition["value"]))
+            compiled.append((key, condition["column"], OPERATORS[op], condition["value"]))
+        return compiled
+
+    def column_values(self, df, column, value, columns):
+        """
+        Returns a column as a numpy array, converted once per frame. Numeric columns become
+        floats, so missing values are NaN and never match a comparison.
+        """
+        numeric = not isinstance(value, str) and not (
+            isinstance(value, list) and any(isinstance(v, str) for v in value)
+        )
+        key = (column, numeric)
+        if key not in columns:
+            if column not in df.columns:
+                raise KeyError(f"Anomaly rules use column '{column}', which is not in the data")
+            if numeric:
+                columns[key] = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            else:
+                columns[key] = df[column].astype(object).to_numpy()
+        return columns[key]
+
+    def evaluate(self, df, conditions, masks, columns):
+        """
+        ANDs the masks of a compiled condition list, reusing masks already computed.
+        """
+        result = np.ones(len(df), dtype=bool)
+        for key, column, op, value in conditions:
+            if key not in masks:
+                values = self.column_values(df, column, value, columns)
+                with np.errstate(invalid='ignore'):
+                    masks[key] = np.asarray(op(values, value), dtype=bool)
+            result &= masks[key]
+        return result
+
+    def classify(self, df):
+        """
+        Labels every row in a single pass: each rule becomes one mask and np.select
+        picks the first matching rule by priority.
+        """
+        masks, columns = {}, {}
+        conditions = [self.evaluate(df, rule, masks, columns) for _, rule in self.rules]
+        choices = [label for label, _ in self.rules]
+        labels = np.select(conditions, choices, default=self.default_label) if len(df) else []
+        return pd.Categorical(labels, categories=self.categories)
+
+    def exempt(self, df):
+        """
+        Returns a mask of the rows covered by an exemption. The frame needs an anomaly column.
+        """
+        masks, columns = {}, {}
+        result = np.zeros(len(df), dtype=bool)
+        for _, conditions, unless in self.exemptions:
+            matched = self.evaluate(df, conditions, masks, columns)
+            if unless:
+                matched &= ~df['anomaly'].isin(unless).to_numpy()
+            result |= matched
+        return result
+
+
+@lru_cache(maxsize=None)
+def load_rules(path=RULES_FILE):
+    """
+    Loads and compiles the rules file once per process.
+    """
+    return AnomalyRules.from_file(path)
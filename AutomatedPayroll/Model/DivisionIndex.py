@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+class DivisionIndex:
+    """
+    Cost center -> division lookup, built once from the Divisions dict.
+
+    Division assignment is a single numpy take over a cost_center_id -> division code
+    array. Cost centers that are in no division (or missing) get the 'Other' division.
+    If a cost center is listed under two divisions, the first one wins.
+    """
+
+    OTHER = 'Other'
+
+    def __init__(self, divisions):
+        self.divisions = list(divisions)
+        self.names = self.divisions + [self.OTHER]
+        self.other_code = len(self.divisions)
+
+        self.ids = {name: frozenset(ids) for name, ids in divisions.items()}
+        self.known_ids = frozenset(cc_id for ids in divisions.values() for cc_id in ids)
+
+        size = max(self.known_ids) + 1 if self.known_ids else 1
+        self.codes = np.full(size, self.other_code, dtype=np.int8)
+        for code, ids in reversed(list(enumerate(divisions.values()))):
+            self.codes[list(ids)] = code
+
+        # division -> sorted (cost_center_id, cost_center_name) tuples, filled by index_centers()
+        self.centers = {}
+
+    def division_codes(self, cost_center_ids):
+        """
+        Returns the division code of every cost center id.
+        """
+        values = pd.to_numeric(pd.Series(cost_center_ids), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            valid = (values >= 0) & (values < len(self.codes)) & (values == np.floor(values))
+        codes = np.full(len(values), self.other_code, dtype=np.int8)
+        codes[valid] = self.codes[values[valid].astype(np.int64)]
+        return codes
+
+    def assign(self, cost_center_ids):
+        """
+        Returns the division name of every cost center id as a categorical.
+        """
+        return pd.Categorical.from_codes(self.division_codes(cost_center_ids), categories=self.names)
+
+    def mask(self, cost_center_ids, division):
+        """
+        Returns a boolean mask of the cost center ids that belong to a division (or to 'Other').
+        """
+        return self.division_codes(cost_center_ids) == self.names.index(division)
+
+    def index_centers(self, shift_data_df):
+        """
+        Precomputes the sorted (cost_center_id, cost_center_name) list of every division,
+        plus 'All', from the cost centers present in the data.
+        """
+        self.centers = {name: [] for name in ['All'] + self.names}
+        if shift_data_df is None or shift_data_df.empty:
+            return
+
+        unique_centers_df = shift_data_df[['cost_center_id', 'cost_center_name']].dropna().drop_duplicates()
+        unique_centers_df = unique_centers_df.sort_values(by='cost_center_name', kind='stable')
+        division = self.assign(unique_centers_df['cost_center_id'])
+
+        self.centers['All'] = list(unique_centers_df.itertuples(index=False, name=None))
+        for name in self.names:
+            self.centers[name] = list(unique_centers_df[division == name].itertuples(index=False, name=None))
+
+    def cost_centers(self, division):
+        """
+        Returns the precomputed cost centers of a division ([] for an unknown division).
+        """
+        return self.centers.get(division, [])
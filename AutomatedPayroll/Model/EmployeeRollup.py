@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Columns of the rollup table, in order
+ROLLUP_COLUMNS = [
+    'user_id', 'employee_name', 'anomaly', 'count', 'excess_hours', 'periods', 'longest_streak', 'current_streak'
+]
+
+
+def period_codes(dates, periods):
+    """
+    Returns the index of the pay period (in the given list) each date falls in, or -1.
+    Periods are matched by start date, so where two overlap the later one wins.
+    """
+    starts = np.array([pd.Timestamp(start).to_datetime64() for start, _ in periods], dtype='datetime64[ns]')
+    ends = np.array([pd.Timestamp(end).to_datetime64() for _, end in periods], dtype='datetime64[ns]')
+    order = np.argsort(starts, kind='stable')
+
+    position = np.searchsorted(starts[order], dates, side='right') - 1
+    found = position >= 0
+    codes = np.full(len(dates), -1, dtype=np.int64)
+    codes[found] = order[position[found]]
+    # Dates after the end of their period are in a gap between periods
+    codes[found & (dates > ends[np.maximum(codes, 0)])] = -1
+    return codes
+
+def rollup_employees(df, periods):
+    """
+    Rolls the classified anomaly rows of several pay periods up to one row per employee and
+    anomaly type: how many times it happened, the excess hours (sum of discrepancy), in how
+    many periods, and the longest and current runs of consecutive periods with it.
+
+    Periods are ranked by start date for the streaks; the current streak is the run that
+    ends with the latest period (0 if the anomaly didn't happen then). Everything is one
+    pass over the rows plus a pass over the (employee, anomaly, period) triples, so a year
+    of periods costs about as much as one. Sorted worst first: longest streak, then count.
+    """
+    if df is None or df.empty or not periods:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    dates = df['date_line'].to_numpy(dtype='datetime64[ns]')
+    period = period_codes(dates, periods)
+    # Rank of each period by start date, so consecutive periods have consecutive ranks
+    starts = [pd.Timestamp(start) for start, _ in periods]
+    rank = np.argsort(np.argsort(starts, kind='stable'), kind='stable')
+
+    inside = period >= 0
+    user_codes, users = pd.factorize(df['user_id'].to_numpy()[inside])
+    anomaly_codes, anomalies = pd.factorize(df['anomaly'].astype(str).to_numpy()[inside])
+    ranks = rank[period[inside]]
+    if len(ranks) == 0:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    # One integer per (employee, anomaly) pair
+    pair = user_codes.astype(np.int64) * len(anomalies) + anomaly_codes
+    rows = pd.DataFrame({
+        'pair': pair,
+        'employee_name': df['employee_name'].to_numpy()[inside],
+        'discrepancy': df['discrepancy'].to_numpy(dtype=float)[inside],
+        'rank': ranks,
+    })
+    table = rows.groupby('pair', sort=True).agg(
+        employee_name=('employee_name', 'first'),
+        count=('rank', 'size'),
+        excess_hours=('discrepancy', 'sum'),
+        periods=('rank', 'nunique'),
+    )
+
+    # Streaks: the (pair, period) triples sorted, split wherever the pair changes or a period is skipped
+    triples = np.unique(pair * len(periods) + ranks)
+    triple_pair = triples // len(periods)
+    triple_rank = triples % len(periods)
+    breaks = np.ones(len(triples), dtype=bool)
+    breaks[1:] = (triple_pair[1:] != triple_pair[:-1]) | (triple_rank[1:] != triple_rank[:-1] + 1)
+    run = np.cumsum(breaks) - 1
+    run_length = np.bincount(run)
+    run_pair = triple_pair[breaks]
+    # The last period of every run
+    run_end_rank = triple_rank[np.r_[np.flatnonzero(breaks)[1:] - 1, len(triples) - 1]]
+
+    runs = pd.DataFrame({'pair': run_pair, 'length': run_length, 'end': run_end_rank})
+    longest = runs.groupby('pair', sort=True)['length'].max()
+    last_run = runs.groupby('pair', sort=True).tail(1).set_index('pair')
+    current = last_run['length'].where(last_run['end'] == len(periods) - 1, 0)
+
+    table['longest_streak'] = longest
+    table['current_streak'] = current
+    table['user_id'] = users[table.index.to_numpy() // len(anomalies)]
+    table['anomaly'] = anomalies[table.index.to_numpy() % len(anomalies)]
+    table = table.sort_values(
+        ['longest_streak', 'count', 'employee_name'], ascending=[False, False, True], kind='stable'
+    )
+    return table[ROLLUP_COLUMNS].reset_index(drop=True)
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Pay periods run Sunday through Saturday
+PERIOD_DAYS = 7
+
+
+def week_start(dates):
+    """
+    Returns the Sunday starting the Sunday-Saturday week of each date.
+    """
+    dates = pd.DatetimeIndex(dates)
+    return (dates - pd.to_timedelta((dates.dayofweek + 1) % 7, unit='D')).normalize()
+
+class PayPeriodCalendar:
+    """
+    The pay periods of the loaded data, from its pay_period_id column. A period's bounds are
+    the Sunday-Saturday week most of its punches are dated in (punches past midnight and
+    the first, partly loaded period don't move them), and the rows it covers in the frame
+    are found once, so selecting a period is a lookup. Ids older than the data are a week
+    apart, which gives the bounds of any historical period.
+    """
+
+    def __init__(self, df=None, today=None):
+        # pay_period_id -> (start, end) Timestamps, for the periods in the data
+        self.bounds = {}
+        # (start, end) -> (first row, row after the last) in the frame
+        self.offsets = {}
+        # Newest (pay_period_id, start); the other ids count weeks from it
+        self.anchor = None
+        self.index(pd.DataFrame() if df is None else df, today)
+
+    def index(self, df, today=None):
+        """
+        Rebuilds the calendar from a frame sorted by date_line (see PayrollAutomation.prepare).
+        """
+        self.bounds.clear()
+        self.offsets.clear()
+
+        has_ids = {'pay_period_id', 'date_line'} <= set(df.columns)
+        rows = df[['pay_period_id', 'date_line']].dropna() if has_ids else pd.DataFrame()
+        if rows.empty:
+            # No data: the current week stands in for the current period
+            self.anchor = (0, week_start([today or datetime.today()])[0])
+            return
+
+        # The week with the most punches of each period (the earlier one on a tie)
+        weeks = pd.DataFrame({
+            'pay_period_id': rows['pay_period_id'].to_numpy(dtype=np.int64),
+            'start': week_start(rows['date_line']),
+        }).groupby(['pay_period_id', 'start']).size().reset_index(name='rows')
+        weeks = weeks.sort_values(
+            ['pay_period_id', 'rows', 'start'], ascending=[True, False, True], kind='stable'
+        ).drop_duplicates('pay_period_id')
+
+        starts = weeks['start'].to_numpy(dtype='datetime64[ns]')
+        ends = starts + np.timedelta64(PERIOD_DAYS - 1, 'D')
+        # Rows are sorted by date_line, so each period is the block between two binary searches
+        dates = df['date_line'].to_numpy(dtype='datetime64[ns]')
+        first = np.searchsorted(dates, starts, side='left')
+        last = np.searchsorted(dates, ends, side='right')
+
+        for period_id, start, end, row_start, row_end in zip(weeks['pay_period_id'], starts, ends, first, last):
+            bounds = (pd.Timestamp(start), pd.Timestamp(end))
+            self.bounds[int(period_id)] = bounds
+            self.offsets[bounds] = (int(row_start), int(row_end))
+
+        newest = max(self.bounds)
+        self.anchor = (newest, self.bounds[newest][0])
+
+    def period_bounds(self, period_id):
+        """
+        Returns the (start, end) Timestamps of a pay period, counted in weeks from the newest
+        one when the id isn't in the data.
+        """
+        if period_id in self.bounds:
+            return self.bounds[period_id]
+        anchor_id, anchor_start = self.anchor
+        start = anchor_start + pd.Timedelta(days=PERIOD_DAYS * (period_id - anchor_id))
+        return start, start + pd.Timedelta(days=PERIOD_DAYS - 1)
+
+    def period(self, period_id):
+        """
+        Returns the (start, end) dates of a pay period as 'YYYY-MM-DD' strings.
+        """
+        start, end = self.period_bounds(period_id)
+        return f'{start:%Y-%m-%d}', f'{end:%Y-%m-%d}'
+
+    def label(self, period_id):
+        return '{} - {}'.format(*self.period(period_id))
+
+    def recent(self, count, complete=False, today=None):
+        """
+        Returns the ids of the newest count pay periods, newest first. complete=True skips
+        the periods that haven't ended yet.
+        """
+        anchor_id, _ = self.anchor
+        newest = anchor_id
+        if complete:
+            today = pd.Timestamp(today or datetime.today()).normalize()
+            while self.period_bounds(newest)[1] >= today:
+                newest -= 1
+        return list(range(newest, newest - count, -1))
+
+    def periods(self, count, complete=False, today=None):
+        """
+        recent() as (start, end) date pairs.
+        """
+        return [self.period(period_id) for period_id in self.recent(count, complete, today)]
+
+    def options(self, count):
+        """
+        Returns {pay_period_id: label} of the newest count pay periods, for a dropdown.
+        """
+        return {period_id: self.label(period_id) for period_id in self.recent(count)}
+
+    def rows(self, start_date, end_date):
+        """
+        Returns the (first row, row after the last) of a pay period in the indexed frame,
+        or None when the range isn't one of its periods.
+        """
+        return self.offsets.get((pd.Timestamp(start_date), pd.Timestamp(end_date)))
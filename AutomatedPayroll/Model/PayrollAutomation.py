@@ -1,317 +1,481 @@
-from datetime import datetime, timedelta
-import sys
-import os
-import pandas as pd
-
-# Ensure compatibility with PyInstaller for relative imports
-def resource_path(relative_path):
-    try:
-        base_path = sys._MEIPASS  # Set by PyInstaller during runtime
-    except AttributeError:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Add the parent directory of this script to the path if needed
-script_dir = os.path.dirname(os.path.abspath(__file__))
-project_root = os.path.abspath(os.path.join(script_dir, '..'))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
-
-from Model.PayrollSQL import export
-
-class PayrollAutomation:
-    """
-    Class for automating payroll analysis and identifying anomalies.
-    """
-
-    #global variable for the divisions data for which cost centers are in which divisions
-    Divisions = {
-            'Division 1': [14, 15, 16, 17, 41, 43, 44, 45, 46, 47, 48, 102, 112, 119, 165, 166, 167, 22, 57],
-            'Division 2': [33, 34, 35, 36, 42, 61, 62, 63, 64, 65, 66, 67, 68, 69, 73, 74, 76, 77, 99, 113, 120, 126, 131, 132, 133, 220, 250, 18, 72],
-            'Division 3': [25, 26, 27, 30, 31, 100, 114, 121, 127, 128, 212, 238, 29],
-            'Division 4': [49, 51, 52, 53, 58, 59, 145, 60, 79, 80, 81, 82, 83, 135, 84, 85, 86, 87, 88, 89, 134, 90, 91, 92, 101, 115, 122, 130],
-            'Division 5': [116, 123, 144, 146, 147],
-            'Division 6': [103, 107, 108, 117, 125, 129, 152, 153, 154, 155, 156, 157, 158, 159, 161, 162, 163, 160],
-            'Division 7': [104, 118, 124, 180, 182, 183, 184, 188],
-            'Florida':    [251, 252, 253, 254, 255]
-                }
-    
-    # global variable for the different type of anomalies an empployee can have
-    anomalies = [
-        'Shift is at least 4 hours longer than scheduled',
-        'Forgot to clock out for at least 10 hours',
-        'Clocked out at least 90 minutes early',
-        'ALS/IFT earning code assigned to 911 cost center',
-        'Did not punch in/PTO'
-    ]
-
-
-    def __init__(self):
-        """
-        Initializes the class and loads shift data from the database.
-        """
-        shift_data = export()  # Should return a DataFrame directly
-
-        self.anomalies = [
-            'Forgot to clock out',
-            'Clocked out 90 min early',
-            'Shift is 4 hours longer than scheduled',
-        ]
-
-        self.shift_data_df = pd.DataFrame(shift_data)
-
-        if not self.shift_data_df.empty:
-            self.shift_data_df['date_line'] = pd.to_datetime(self.shift_data_df['date_line'], errors='coerce')
-            self.shift_data_df['date'] = self.shift_data_df['date_line']
-
-        pd.set_option('display.max_rows', None)
-
-    def get_pay_period(self, start_date, end_date):
-        """
-        Filters shift data between two dates.
-        """
-        pay_period_data = self.shift_data_df[
-            (self.shift_data_df['date'] >= pd.to_datetime(start_date)) &
-            (self.shift_data_df['date'] <= pd.to_datetime(end_date))
-        ]
-        return pay_period_data if not pay_period_data.empty else None
-
-    def get_discrepancies(self, pay_period_data):
-        """
-        Identifies rows with significant time discrepancies.
-        """
-        if pay_period_data is None or pay_period_data.empty:
-            return None
-        discrepancies = pay_period_data[
-            (pay_period_data['discrepancy'].abs() > 1)
-        ]
-        return discrepancies if not discrepancies.empty else None
-
-    def punch_anomaly(self, row):
-        """
-        Classifies anomaly type for a given row.
-        """
-        if row['actual_hours'] == 0:
-            return 'Did not punch in/PTO'
-
-        if (row['earning_code_id'] in [53, 58]) and (126 <= row['cost_center_id'] <= 135):
-            return 'ALS/IFT earning code assigned to 911 cost center'
-
-        if row['discrepancy'] <= -1.5:
-            return 'Clocked out at least 90 minutes early'
-
-        elif row['discrepancy'] >= 10.0:
-            return 'Forgot to clock out for at least 10 hours'
-
-        elif 4.0 <= row['discrepancy'] < 10.0:
-            return 'Shift is at least 4 hours longer than scheduled'
-
-        else:
-            return 'No anomaly'
-
-    def get_punch_issues(self, df):
-        """
-        Applies anomaly logic to each row.
-        """
-        df = df.copy()
-        df['anomaly'] = df.apply(self.punch_anomaly, axis=1)
-        return df
-
-    def get_anomaly_table(self, start_date=None, end_date=None):
-        """
-        Returns a DataFrame of anomalies between two dates.
-        """
-        pay_period = self.get_pay_period(start_date, end_date)
-        anomalies = self.get_discrepancies(pay_period)
-        if anomalies is not None:
-            return self.get_punch_issues(anomalies)
-        return None
-
-    def filter_24_hours(self, start_date, end_date):
-        """
-        Drops:
-        - 24-hour shifts that do NOT have the specific anomaly
-        - Rows with 'No anomaly' as the anomaly type
-        """
-        df = self.get_anomaly_table(start_date, end_date)
-        if df is None or df.empty:
-            return None
-        
-        condition = (
-            (df['scheduled_hours'] >= 23) &
-            (df['actual_hours'] > 11) & (df['actual_hours'] < 13) &
-            (df['anomaly'] != 'ALS/IFT earning code assigned to 911 cost center')
-        )
-        filtered_df = df[~condition]
-
-        filtered_df = filtered_df[filtered_df['anomaly'] != 'No anomaly']
-
-        return filtered_df
-        # return df
-    
-    def filter_anomaly(self, anomaly, start_date, end_date):
-        """
-        Filters results by specific anomalies that the user provides.
-        If 'All' is selected, return all anomalies.
-        """
-        df = self.filter_24_hours(start_date, end_date)
-        if df is None or df.empty:
-            return None
-
-        if anomaly == 'All':
-            return df  # No filtering if 'All' is selected
-        
-        filtered_df = df[df['anomaly'] == anomaly]
-        return filtered_df
-    
-    def filter_division(self, anomaly, start_date, end_date, division):
-        """
-        Filters results in the table by division based on predefined cost center IDs.
-        If 'Other' is selected, returns rows where cost_center_id is not in any known division.
-        """
-        df = self.filter_anomaly(anomaly, start_date, end_date)
-        if df is None or df.empty:
-            return None
-
-        if division == 'All':
-            return df
-
-        # Get all known cost center IDs
-        all_known_ids = {id for ids in self.Divisions.values() for id in ids}
-
-        if division == 'Other':
-            return df[~df['cost_center_id'].isin(all_known_ids)]
-
-        return df[df['cost_center_id'].isin(self.Divisions[division])]
-
-    
-    def filter_cost_centers(self, anomaly, start_date, end_date, division, center):
-        """
-        Filters by a specific cost center name that is located in the specified division.
-        """
-        df = self.filter_division(anomaly, start_date, end_date, division)
-        if df is None or df.empty:
-            return None
-
-        if center == 'All':
-            return df
-
-        # # Get all known cost center IDs
-        # all_known_ids = {id for ids in self.Divisions.values() for id in ids}
-
-        # if division == 'Other':
-        #     df = df[~df['cost_center_id'].isin(all_known_ids)]
-        # else:
-        #     df = df[df['cost_center_id'].isin(self.Divisions[division])]
-
-        # Filter by cost_center_name
-        return df[df['cost_center_name'] == center]
-    
-    def get_cost_centers(self, division):
-        """
-        Returns a sorted list of unique (cost_center_id, cost_center_name) tuples filtered by division.
-
-        - If division == 'All', return all cost centers.
-        - If division == 'Other', return cost centers not in any division.
-        - Otherwise, return cost centers for the specified division.
-        """
-        if self.shift_data_df is None or self.shift_data_df.empty:
-            return []
-
-        # Get unique cost centers
-        unique_centers_df = self.shift_data_df[['cost_center_id', 'cost_center_name']].dropna().drop_duplicates()
-
-        # All known cost center IDs in all divisions
-        all_known_ids = {id for ids in self.Divisions.values() for id in ids}
-
-        if division == 'All':
-            filtered_df = unique_centers_df
-        elif division == 'Other':
-            filtered_df = unique_centers_df[~unique_centers_df['cost_center_id'].isin(all_known_ids)]
-        else:
-            # Check if division exists in Divisions dict
-            if division not in self.Divisions:
-                return []
-            division_ids = set(self.Divisions[division])
-            filtered_df = unique_centers_df[unique_centers_df['cost_center_id'].isin(division_ids)]
-
-        # Sort by cost_center_name
-        sorted_centers = filtered_df.sort_values(by='cost_center_name')
-
-        # Return list of tuples (cost_center_id, cost_center_name)
-        return list(sorted_centers.itertuples(index=False, name=None))
-
-    def create_dashboard(self, start_date, end_date):
-        df = self.filter_24_hours(start_date, end_date)
-        all_anomalies = [
-            'Shift is at least 4 hours longer than scheduled',
-            'Forgot to clock out for at least 10 hours',
-            'Clocked out at least 90 minutes early',
-            'ALS/IFT earning code assigned to 911 cost center',
-            'Did not punch in/PTO'
-        ]
-        all_divisions = list(self.Divisions.keys())
-
-        if df is None or df.empty:
-            # Return empty dashboard with zeros including 'Other'
-            empty_data = {div: [0]*len(all_anomalies) for div in all_divisions}
-            empty_data['Other'] = [0]*len(all_anomalies)  # Add Other column
-            dashboard = pd.DataFrame(empty_data, index=all_anomalies)
-            dashboard['Totals'] = dashboard.sum(axis=1)  # Add Totals column
-            dashboard.loc['Actual Total'] = dashboard.sum()
-            return dashboard
-
-        # Map cost_center_id to division
-        def map_division(cc_id):
-            for div, ids in self.Divisions.items():
-                if cc_id in ids:
-                    return div
-            return 'Unassigned'
-
-        df['division'] = df['cost_center_id'].apply(map_division)
-
-        # Count anomalies per division including 'Unassigned'
-        summary = pd.crosstab(index=df['anomaly'], columns=df['division'])
-
-        # Extract 'Unassigned' counts (if any)
-        if 'Unassigned' in summary.columns:
-            other_col = summary['Unassigned']
-            summary = summary.drop(columns=['Unassigned'])
-        else:
-            other_col = pd.Series(0, index=summary.index)
-
-        # Ensure all anomalies and all divisions present
-        combined_anomalies = summary.index.union(pd.Index(all_anomalies))
-        summary = summary.reindex(index=combined_anomalies, columns=all_divisions, fill_value=0)
-
-        # Add 'Other' column with Unassigned counts aligned by anomaly index
-        other_col = other_col.reindex(summary.index, fill_value=0)
-        summary['Other'] = other_col
-
-        # Add 'Totals' column summing across all divisions + Other
-        summary['Totals'] = summary.sum(axis=1)
-
-        # Add 'Actual Total' row summing everything including Totals column
-        summary.loc['Actual Total'] = summary.sum()
-
-        return summary
-
-
-
-if __name__ == "__main__":
-    payroll = PayrollAutomation()
-    dashboard_df = payroll.create_dashboard("2025-07-01", "2025-07-08")
-    with pd.option_context('display.max_columns', None, 'display.expand_frame_repr', False):
-     print(dashboard_df)
-
-
-payroll = PayrollAutomation()
-
-division_name = 'Division 2'
-division_centers = payroll.get_cost_centers(division_name)
-print(f"Cost centers for {division_name}:")
-print(division_centers)
-
-
-    # dashboard_df = self.create_dashboard("2025-07-01", "2025-07-15")
-    # print(dashboard_df)
+from datetime import datetime, timedelta
+import sys
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# Ensure compatibility with PyInstaller for relative imports
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS  # Set by PyInstaller during runtime
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# Add the parent directory of this script to the path if needed
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(script_dir, '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# Model.PayrollSQL (and with it SQLAlchemy) is imported only when the database is queried
+from Model.PayrollCache import cached_days, load_cache, uncached_ranges
+from Model.AnomalyRules import load_rules
+from Model.ResultCache import ResultCache
+from Model.DivisionIndex import DivisionIndex
+from Model.AnomalyCube import AnomalyCube
+from Model.EmployeeRollup import rollup_employees
+from Model.PayPeriodCalendar import PayPeriodCalendar
+from Model.PayrollSchema import enforce_schema
+from Model.PayrollProfiler import instrument, note_cache, set_rows
+from Model.ReviewSnapshots import diff_snapshot, load_snapshot, save_snapshot, snapshot_stamp
+
+# Rows whose actual hours differ from the schedule by more than this many hours are anomaly candidates
+MIN_DISCREPANCY = 1
+
+# The PayrollAutomation shared by the whole process (see shared_payroll)
+shared = {"payroll": None}
+shared_lock = threading.Lock()
+
+class PayrollAutomation:
+    """
+    Class for automating payroll analysis and identifying anomalies.
+    """
+
+    #global variable for the divisions data for which cost centers are in which divisions
+    Divisions = {
+            'Division 1': [14, 15, 16, 17, 41, 43, 44, 45, 46, 47, 48, 102, 112, 119, 165, 166, 167, 22, 57],
+            'Division 2': [33, 34, 35, 36, 42, 61, 62, 63, 64, 65, 66, 67, 68, 69, 73, 74, 76, 77, 99, 113, 120, 126, 131, 132, 133, 220, 250, 18, 72],
+            'Division 3': [25, 26, 27, 30, 31, 100, 114, 121, 127, 128, 212, 238, 29],
+            'Division 4': [49, 51, 52, 53, 58, 59, 145, 60, 79, 80, 81, 82, 83, 135, 84, 85, 86, 87, 88, 89, 134, 90, 91, 92, 101, 115, 122, 130],
+            'Division 5': [116, 123, 144, 146, 147],
+            'Division 6': [103, 107, 108, 117, 125, 129, 152, 153, 154, 155, 156, 157, 158, 159, 161, 162, 163, 160],
+            'Division 7': [104, 118, 124, 180, 182, 183, 184, 188],
+            'Florida':    [251, 252, 253, 254, 255]
+                }
+    
+
+    def __init__(self, shift_data=None):
+        """
+        Initializes the class and loads shift data from the database,
+        or from the given frame (same columns as export()) when there is one.
+        """
+        # Anomaly rules and labels come from Model/anomaly_rules.json
+        self.rules = load_rules()
+        self.anomalies = self.rules.labels
+
+        # Cost center -> division lookup, built once from Divisions
+        self.division_index = DivisionIndex(self.Divisions)
+
+        # Pay periods of the loaded data, by pay_period_id
+        self.calendar = PayPeriodCalendar()
+
+        # Classified anomaly table per date range, and the filtered views derived from it
+        self.period_cache = ResultCache(maxsize=8, name="periods")
+        self.view_cache = ResultCache(maxsize=64, name="views")
+
+        if shift_data is None:
+            from Model.PayrollSQL import export
+            shift_data = export()  # Should return a DataFrame directly
+        self.load(shift_data)
+
+        pd.set_option('display.max_rows', None)
+
+    @instrument()
+    def load(self, shift_data):
+        """
+        Replaces the shift data and drops every cached result computed from the old data.
+        """
+        self.shift_data_df = self.prepare(pd.DataFrame(shift_data))
+
+        # First day held in memory; older ranges come from the on-disk cache
+        if not self.shift_data_df.empty:
+            self.window_start = self.shift_data_df['date_line'].min()
+        else:
+            from Model.PayrollSQL import LOOKBACK_DAYS
+            self.window_start = pd.Timestamp(datetime.today().date() - timedelta(days=LOOKBACK_DAYS))
+
+        # Cost center dropdown lists per division
+        self.division_index.index_centers(self.shift_data_df)
+        # Pay period bounds and row blocks
+        self.calendar.index(self.shift_data_df)
+
+        self.period_cache.clear()
+        self.view_cache.clear()
+
+    def refresh(self, incremental=True):
+        """
+        Pulls new data through export() and invalidates the result caches.
+        """
+        from Model.PayrollSQL import export
+        self.load(export(incremental=incremental))
+
+    def cache_stats(self):
+        """
+        Returns the hit/miss counters of the result caches.
+        """
+        return {
+            "periods": self.period_cache.stats(),
+            "views": self.view_cache.stats(),
+        }
+
+    def period_key(self, start_date, end_date):
+        return (pd.Timestamp(start_date), pd.Timestamp(end_date))
+
+    def prepare(self, shift_data_df):
+        """
+        Converts the exported punch dates to datetimes and sorts the rows by date once,
+        so a pay period is a contiguous block of rows (see get_pay_period).
+        """
+        if not shift_data_df.empty:
+            shift_data_df['date_line'] = pd.to_datetime(shift_data_df['date_line'], errors='coerce')
+            if not shift_data_df['date_line'].is_monotonic_increasing:
+                shift_data_df = shift_data_df.sort_values('date_line', kind='stable', na_position='last')
+            shift_data_df = shift_data_df.reset_index(drop=True)
+        return shift_data_df
+
+    @instrument()
+    def get_pay_period(self, start_date, end_date, min_discrepancy=None):
+        """
+        Filters shift data between two dates.
+        Ranges that start before the loaded window take their older days from the on-disk
+        cache where it holds them, otherwise from the database (see load_history);
+        min_discrepancy lets the database skip the rows that cannot be anomalies (rows from
+        memory or the disk cache are not filtered).
+        """
+        shift_data_df = self.shift_data_df
+        if pd.to_datetime(start_date) < self.window_start:
+            shift_data_df = self.prepare(self.load_history(start_date, end_date, min_discrepancy))
+        set_rows(rows_in=len(shift_data_df))
+
+        if shift_data_df.empty:
+            return None
+
+        # A pay period of the loaded data is a block of rows the calendar found on load; any
+        # other range is the block between two binary searches (rows are sorted by date_line)
+        rows = self.calendar.rows(start_date, end_date) if shift_data_df is self.shift_data_df else None
+        if rows is None:
+            dates = shift_data_df['date_line'].to_numpy()
+            rows = (
+                np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side='left'),
+                np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side='right'),
+            )
+        start, end = rows
+
+        pay_period_data = shift_data_df.iloc[start:end]
+        return pay_period_data if not pay_period_data.empty else None
+
+    @instrument()
+    def load_history(self, start_date, end_date, min_discrepancy=None):
+        """
+        Returns the rows of a range that starts before the loaded window. Days before the
+        window come from the day partitions of the on-disk cache, and the runs of days it
+        doesn't hold (a gap between a backfill and the window) from query_period; days
+        inside the window come from the loaded data.
+        """
+        start_date, end_date = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        history_end = min(end_date, self.window_start - pd.Timedelta(days=1))
+        parts = []
+
+        if cached_days(start_date, history_end):
+            note_cache("disk", True)
+            parts.append(enforce_schema(load_cache(start_date, history_end)))
+
+        missing = uncached_ranges(start_date, history_end)
+        if missing:
+            note_cache("disk", False)
+            print(f"Querying {len(missing)} range(s) outside the cached window from database...")
+            from Model.PayrollSQL import query_period
+            parts += [query_period(first, last, min_discrepancy=min_discrepancy) for first, last in missing]
+
+        if end_date >= self.window_start:
+            dates = self.shift_data_df['date_line'].to_numpy()
+            parts.append(self.shift_data_df.iloc[:np.searchsorted(dates, end_date.to_datetime64(), side='right')])
+
+        parts = [part for part in parts if part is not None and not part.empty]
+        if not parts:
+            return pd.DataFrame(columns=self.shift_data_df.columns)
+        return enforce_schema(pd.concat(parts, ignore_index=True))
+
+    @instrument()
+    def get_discrepancies(self, pay_period_data):
+        """
+        Identifies rows with significant time discrepancies.
+        """
+        if pay_period_data is None or pay_period_data.empty:
+            return None
+        discrepancies = pay_period_data[
+            (pay_period_data['discrepancy'].abs() > MIN_DISCREPANCY)
+        ]
+        return discrepancies if not discrepancies.empty else None
+
+    def punch_anomaly(self, row):
+        """
+        Classifies anomaly type for a given row.
+        """
+        return self.rules.classify(pd.DataFrame([row]))[0]
+
+    def classify_anomalies(self, df):
+        """
+        Classifies every row at once with the compiled anomaly rules.
+        Returns a categorical with every anomaly label plus 'No anomaly'.
+        """
+        return self.rules.classify(df)
+
+    @instrument()
+    def get_punch_issues(self, df):
+        """
+        Applies anomaly logic to every row at once.
+        """
+        df = df.copy()
+        df['anomaly'] = self.classify_anomalies(df)
+        return df
+
+    def get_anomaly_table(self, start_date=None, end_date=None):
+        """
+        Returns a DataFrame of anomalies between two dates.
+        """
+        pay_period = self.get_pay_period(start_date, end_date, min_discrepancy=MIN_DISCREPANCY)
+        anomalies = self.get_discrepancies(pay_period)
+        if anomalies is not None:
+            return self.get_punch_issues(anomalies)
+        return None
+
+    @instrument()
+    def filter_24_hours(self, start_date, end_date):
+        """
+        Returns the classified anomaly table for a date range, computed once per range and
+        then served from the period cache. The returned frame is shared, so don't modify it.
+        """
+        key = self.period_key(start_date, end_date)
+        return self.period_cache.get_or_compute(key, lambda: self.classify_period(start_date, end_date))
+
+    def classify_period(self, start_date, end_date):
+        """
+        Drops:
+        - Rows covered by an exemption in the anomaly rules (24-hour shifts that do NOT have the ALS/IFT anomaly)
+        - Rows with 'No anomaly' as the anomaly type
+        """
+        df = self.get_anomaly_table(start_date, end_date)
+        if df is None or df.empty:
+            return None
+        
+        condition = self.rules.exempt(df)
+        filtered_df = df[~condition]
+
+        filtered_df = filtered_df[filtered_df['anomaly'] != self.rules.default_label]
+
+        return filtered_df
+        # return df
+    
+    @instrument()
+    def filter_anomaly(self, anomaly, start_date, end_date):
+        """
+        Filters results by specific anomalies that the user provides.
+        If 'All' is selected, return all anomalies.
+        """
+        df = self.filter_24_hours(start_date, end_date)
+        if df is None or df.empty:
+            return None
+
+        if anomaly == 'All':
+            return df  # No filtering if 'All' is selected
+        
+        filtered_df = df[df['anomaly'] == anomaly]
+        return filtered_df
+    
+    @instrument()
+    def filter_division(self, anomaly, start_date, end_date, division):
+        """
+        Filters results in the table by division based on predefined cost center IDs.
+        If 'Other' is selected, returns rows where cost_center_id is not in any known division.
+        """
+        df = self.filter_anomaly(anomaly, start_date, end_date)
+        if df is None or df.empty:
+            return None
+
+        if division == 'All':
+            return df
+
+        # 'Other' is a division of its own in the index
+        return df[self.division_index.mask(df['cost_center_id'], division)]
+
+    
+    @instrument()
+    def filter_cost_centers(self, anomaly, start_date, end_date, division, center):
+        """
+        Filters by a specific cost center name that is located in the specified division.
+        Each (period, anomaly, division, center) view is cached; the returned frame is shared.
+        """
+        key = self.period_key(start_date, end_date) + (anomaly, division, center)
+        return self.view_cache.get_or_compute(
+            key, lambda: self.select_cost_center(anomaly, start_date, end_date, division, center)
+        )
+
+    def select_cost_center(self, anomaly, start_date, end_date, division, center):
+        """
+        Computes the filter_cost_centers view from the cached anomaly table.
+        """
+        df = self.filter_division(anomaly, start_date, end_date, division)
+        if df is None or df.empty:
+            return None
+
+        if center == 'All':
+            return df
+
+        # # Get all known cost center IDs
+        # all_known_ids = {id for ids in self.Divisions.values() for id in ids}
+
+        # if division == 'Other':
+        #     df = df[~df['cost_center_id'].isin(all_known_ids)]
+        # else:
+        #     df = df[df['cost_center_id'].isin(self.Divisions[division])]
+
+        # Filter by cost_center_name
+        return df[df['cost_center_name'] == center]
+    
+    def get_cost_centers(self, division):
+        """
+        Returns a sorted list of unique (cost_center_id, cost_center_name) tuples filtered by division.
+
+        - If division == 'All', return all cost centers.
+        - If division == 'Other', return cost centers not in any division.
+        - Otherwise, return cost centers for the specified division.
+        """
+        return self.division_index.cost_centers(division)
+
+    @instrument()
+    def anomaly_cube(self, periods):
+        """
+        Returns the AnomalyCube of several (start, end) pay periods. The span they cover is
+        classified once (and cached), so comparing periods costs about as much as one period.
+        """
+        start_date = min(pd.Timestamp(start) for start, _ in periods)
+        end_date = max(pd.Timestamp(end) for _, end in periods)
+        df = self.filter_24_hours(f"{start_date:%Y-%m-%d}", f"{end_date:%Y-%m-%d}")
+        return AnomalyCube(df, periods, self.anomalies, self.division_index)
+
+    @instrument()
+    def create_dashboard(self, start_date, end_date):
+        """
+        Counts anomalies per division for one pay period, with a 'Totals' column
+        (cost centers outside every division are under 'Other') and an 'Actual Total' row.
+        """
+        return self.anomaly_cube([(start_date, end_date)]).dashboard(0)
+
+    @instrument()
+    def create_trend(self, periods, division='All'):
+        """
+        Counts anomalies per pay period for all divisions or one division.
+        """
+        return self.anomaly_cube(periods).trend(division)
+
+    @instrument()
+    def employee_rollup(self, periods, anomaly='All', division='All'):
+        """
+        Returns one row per employee and anomaly type over several (start, end) pay periods:
+        counts, excess hours, periods with it and streaks (see EmployeeRollup.rollup_employees).
+        The span is classified once, like anomaly_cube; the table is cached per selection.
+        """
+        key = ('rollup', tuple(self.period_key(start, end) for start, end in periods), anomaly, division)
+
+        def compute():
+            start_date = min(pd.Timestamp(start) for start, _ in periods)
+            end_date = max(pd.Timestamp(end) for _, end in periods)
+            df = self.filter_division(anomaly, f"{start_date:%Y-%m-%d}", f"{end_date:%Y-%m-%d}", division)
+            return rollup_employees(df, periods)
+        return self.view_cache.get_or_compute(key, compute)
+
+    def top_offenders(self, periods, n=20, anomaly='All', division='All'):
+        """
+        Returns the n employee/anomaly rows with the longest streaks (then the most occurrences).
+        """
+        return self.employee_rollup(periods, anomaly, division).head(n)
+
+    # === Changes since last review ===
+    def mark_reviewed(self, start_date, end_date):
+        """
+        Saves the current anomalies of a pay period as reviewed. Returns the review time.
+        """
+        return save_snapshot(self.filter_24_hours(start_date, end_date), start_date, end_date)
+
+    def last_reviewed(self, start_date, end_date):
+        """
+        Returns when a pay period was last marked reviewed, or None.
+        """
+        stamp = snapshot_stamp(start_date, end_date)
+        return None if stamp is None else datetime.fromtimestamp(stamp / 1e9)
+
+    @instrument()
+    def review_changes(self, start_date, end_date):
+        """
+        Returns the new, resolved and changed anomalies of a pay period since its last review
+        (see ReviewSnapshots.diff_snapshot). The current side is the cached anomaly table, so
+        only the snapshot is read; the diff is cached until the data or the review changes.
+        """
+        key = ('changes',) + self.period_key(start_date, end_date) + (snapshot_stamp(start_date, end_date),)
+
+        def compute():
+            previous, _ = load_snapshot(start_date, end_date)
+            return diff_snapshot(previous, self.filter_24_hours(start_date, end_date))
+        return self.view_cache.get_or_compute(key, compute)
+
+    @instrument()
+    def filter_changes(self, anomaly, start_date, end_date, division, center):
+        """
+        filter_cost_centers for the changes since the last review. An anomaly selection also
+        matches rows that had that anomaly at the review (resolved or reclassified ones).
+        """
+        df = self.review_changes(start_date, end_date)
+        if df.empty:
+            return None
+
+        if anomaly != 'All':
+            df = df[(df['anomaly'] == anomaly) | (df['previous_anomaly'] == anomaly)]
+        if division != 'All':
+            df = df[self.division_index.mask(df['cost_center_id'], division)]
+        if center != 'All':
+            df = df[df['cost_center_name'] == center]
+        return None if df.empty else df
+
+
+def shared_payroll():
+    """
+    Returns the process's PayrollAutomation, loading the data on the first call only.
+    Callers that arrive while it loads wait for that load instead of starting another.
+    """
+    with shared_lock:
+        if shared["payroll"] is None:
+            shared["payroll"] = PayrollAutomation()
+        return shared["payroll"]
+
+def refresh_shared(incremental=True):
+    """
+    Syncs with the database into a new PayrollAutomation and makes it the shared one.
+    Searches already running keep the instance they started with, so nobody sees a half
+    replaced frame or a cache cleared mid-search. Only the loaded window is pinned that way:
+    days before it are read from the on-disk cache and the database when a search asks for
+    them (see load_history), so those see changes made since the load. Returns the new instance.
+    """
+    from Model.PayrollSQL import export
+    payroll = PayrollAutomation(export(incremental=incremental, sync=True))
+    with shared_lock:
+        shared["payroll"] = payroll
+    return payroll
+
+
+if __name__ == "__main__":
+    payroll = shared_payroll()
+    dashboard_df = payroll.create_dashboard("2025-07-01", "2025-07-08")
+    with pd.option_context('display.max_columns', None, 'display.expand_frame_repr', False):
+     print(dashboard_df)
+
+    division_name = 'Division 2'
+    division_centers = payroll.get_cost_centers(division_name)
+    print(f"Cost centers for {division_name}:")
+    print(division_centers)
+
+
+    # dashboard_df = self.create_dashboard("2025-07-01", "2025-07-15")
+    # print(dashboard_df)
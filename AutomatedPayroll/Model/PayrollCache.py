@@ -0,0 +1,204 @@
+import json
+import os
+import sys
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# === Add for PyInstaller compatibility ===
+def resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# === On-disk cache layout ===
+# TEST_cache/
+#     meta.json               <- sync date, watermark and the list of cached days (backfilled days are flagged)
+#     days/2025-07-01.parquet <- one columnar file per date_line
+CACHE_DIR = os.environ.get("PAYROLL_CACHE_DIR", resource_path("TEST_cache"))
+META_FILE = os.path.join(CACHE_DIR, "meta.json")
+DAYS_DIR = os.path.join(CACHE_DIR, "days")
+
+# Columns returned by PayrollSQL.export(), written with a fixed schema so every
+# day file can be concatenated without type promotion
+CACHE_SCHEMA = pa.schema([
+    ("employee_name", pa.string()),
+    ("id", pa.int64()),
+    ("user_id", pa.int64()),
+    ("date_line", pa.date32()),
+    ("earning_code_id", pa.int64()),
+    ("cost_center_id", pa.int64()),
+    ("cost_center_name", pa.string()),
+    ("pay_period_id", pa.int64()),
+    ("actual_hours", pa.float64()),
+    ("scheduled_start", pa.timestamp("ns")),
+    ("scheduled_end", pa.timestamp("ns")),
+    ("scheduled_hours", pa.float64()),
+    ("discrepancy", pa.float64()),
+])
+
+def empty_meta():
+    return {"date": "2000-01-01", "watermark": None, "days": {}}
+
+
+def day_path(day):
+    return os.path.join(DAYS_DIR, f"{day}.parquet")
+
+def day_keys(df):
+    """
+    Returns the date_line of every row as a 'YYYY-MM-DD' string.
+    """
+    return pd.to_datetime(df['date_line']).dt.strftime('%Y-%m-%d')
+
+def read_cache_meta():
+    """
+    Reads the small metadata sidecar, without touching any of the day files.
+    """
+    if not os.path.exists(META_FILE):
+        return empty_meta()
+    with open(META_FILE, "r") as f:
+        return json.load(f)
+
+def write_cache_meta(meta):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_file = META_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_file, META_FILE)
+
+def is_cache_fresh():
+    return read_cache_meta().get("date") == str(date.today())
+
+def to_table(df):
+    """
+    Converts a frame to an Arrow table with the cache schema, filling in any missing columns.
+    """
+    df = df.reindex(columns=CACHE_SCHEMA.names)
+    table = pa.Table.from_pandas(df, schema=CACHE_SCHEMA, preserve_index=False)
+    # Drop the pandas dtype metadata so every day file has the identical schema;
+    # the in-memory types are restored by PayrollSchema.enforce_schema after loading
+    return table.replace_schema_metadata(None)
+
+def save_cache(df, watermark=None, days=None, cutoff_date=None):
+    """
+    Writes the frame to the day partitions and updates the sidecar.
+
+    - days=None rewrites the whole cache from df.
+    - Otherwise only the listed days are rewritten (a listed day with no rows is removed).
+    - Days older than cutoff_date are dropped from disk.
+    """
+    os.makedirs(DAYS_DIR, exist_ok=True)
+    meta = read_cache_meta()
+    if days is None:
+        # Full rewrite, except for the backfilled days (see append_days)
+        meta["days"] = {day: entry for day, entry in meta["days"].items() if entry.get("backfill")}
+
+    if not df.empty:
+        keys = day_keys(df)
+        if days is not None:
+            df, keys = df[keys.isin(days)], keys[keys.isin(days)]
+        groups = {day: part for day, part in df.groupby(keys.values)}
+    else:
+        groups = {}
+
+    write_days = set(groups) if days is None else set(days)
+    if days is None:
+        # Full rewrite: anything on disk that is not in the new frame or backfilled goes
+        write_days |= {name[:-len(".parquet")] for name in os.listdir(DAYS_DIR)} - set(meta["days"])
+
+    for day in write_days:
+        part = groups.get(day)
+        if part is None or part.empty:
+            if os.path.exists(day_path(day)):
+                os.remove(day_path(day))
+            meta["days"].pop(day, None)
+            continue
+        pq.write_table(to_table(part), day_path(day))
+        meta["days"][day] = dict(meta["days"].get(day, {}), rows=len(part))
+
+    if cutoff_date is not None:
+        prune_cache(meta, cutoff_date)
+
+    meta["date"] = str(date.today())
+    meta["watermark"] = watermark
+    write_cache_meta(meta)
+
+def append_days(df):
+    """
+    Writes the days in df as backfilled partitions, replacing any cached copy of those days.
+    Backfilled days are kept when they fall out of the rolling window, so older ranges pulled
+    for audits stay on disk. The sync date and watermark are left alone.
+    Returns the days written.
+    """
+    if df.empty:
+        return []
+
+    os.makedirs(DAYS_DIR, exist_ok=True)
+    meta = read_cache_meta()
+    keys = day_keys(df)
+    for day, part in df.groupby(keys.values):
+        pq.write_table(to_table(part), day_path(day))
+        meta["days"][day] = {"rows": len(part), "backfill": True}
+    write_cache_meta(meta)
+    return sorted(keys.unique())
+
+def prune_cache(meta, cutoff_date):
+    """
+    Removes the day files older than the cutoff date, except backfilled days.
+    """
+    old_days = [
+        day for day, entry in meta["days"].items()
+        if day < str(cutoff_date) and not entry.get("backfill")
+    ]
+    for day in old_days:
+        if os.path.exists(day_path(day)):
+            os.remove(day_path(day))
+        meta["days"].pop(day)
+
+def cached_days(start_date=None, end_date=None, meta=None):
+    """
+    Lists the cached days that overlap the requested range, using only the sidecar.
+    """
+    meta = meta if meta is not None else read_cache_meta()
+    start = str(pd.to_datetime(start_date).date()) if start_date is not None else None
+    end = str(pd.to_datetime(end_date).date()) if end_date is not None else None
+    return sorted(
+        day for day in meta["days"]
+        if (start is None or day >= start) and (end is None or day <= end)
+    )
+
+def uncached_ranges(start_date, end_date, meta=None):
+    """
+    Returns the runs of days in the range that have no cached day file, as (first, last)
+    'YYYY-MM-DD' pairs, using only the sidecar.
+    """
+    cached = set(cached_days(start_date, end_date, meta))
+    ranges = []
+    for day in pd.date_range(pd.to_datetime(start_date).normalize(), pd.to_datetime(end_date).normalize()):
+        if f"{day:%Y-%m-%d}" in cached:
+            continue
+        if ranges and ranges[-1][1] == day - pd.Timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return [(f"{first:%Y-%m-%d}", f"{last:%Y-%m-%d}") for first, last in ranges]
+
+def load_cache(start_date=None, end_date=None, columns=None):
+    """
+    Loads the cached rows between two dates (both optional), reading only the day files
+    that overlap the range. Files are memory-mapped and concatenated as Arrow tables
+    before a single conversion to pandas.
+    """
+    days = cached_days(start_date, end_date)
+    tables = [
+        pq.read_table(day_path(day), columns=columns, memory_map=True)
+        for day in days if os.path.exists(day_path(day))
+    ]
+    if not tables:
+        names = columns if columns is not None else CACHE_SCHEMA.names
+        return pd.DataFrame(columns=names)
+    return pa.concat_tables(tables).to_pandas()
@@ -0,0 +1,154 @@
+import gzip
+import importlib.util
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Excel output needs one of these; xlsxwriter is preferred (it streams rows to disk).
+# They are imported by write_xlsx, only when an Excel file is written
+XLSX_WRITERS = [name for name in ("xlsxwriter", "openpyxl") if importlib.util.find_spec(name) is not None]
+
+# Download formats and their file extensions
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "parquet": ".parquet",
+    "xlsx": ".xlsx",
+}
+
+# Rows converted and written at a time, so a large result is never copied in one piece
+BATCH_ROWS = 50000
+# Rows in an Excel sheet, header included
+XLSX_MAX_ROWS = 1048576
+# Day 0 of Excel's date numbers
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+# gzip level 6 is several times faster than the default 9 for a slightly larger file
+GZIP_LEVEL = 6
+
+
+def export_formats():
+    """
+    Returns the formats that can be written here (xlsx needs xlsxwriter or openpyxl).
+    """
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "xlsx" or XLSX_WRITERS]
+
+def export_path(name, fmt, folder=None):
+    """
+    Returns the file path for a report name in the given format, in ~/Downloads by default.
+    """
+    folder = folder if folder is not None else str(Path.home() / "Downloads")
+    return os.path.join(folder, name + EXPORT_FORMATS[fmt])
+
+def batches(df, batch_rows=BATCH_ROWS):
+    for start in range(0, len(df), batch_rows):
+        yield df.iloc[start:start + batch_rows]
+
+
+# === Writers ===
+def write_csv(df, f, batch_rows):
+    for i, batch in enumerate(batches(df, batch_rows)):
+        batch.to_csv(f, header=(i == 0), index=False)
+
+def write_parquet(df, path, batch_rows):
+    writer = None
+    try:
+        for batch in batches(df, batch_rows):
+            table = pa.Table.from_pandas(
+                batch, schema=writer.schema if writer else None, preserve_index=False
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+def date_columns(df):
+    """
+    Returns {column position: Excel number format} for the datetime columns.
+    """
+    formats = {}
+    for position, name in enumerate(df.columns):
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            present = column.dropna()
+            date_only = (present == present.dt.normalize()).all()
+            formats[position] = "yyyy-mm-dd" if date_only else "yyyy-mm-dd hh:mm"
+    return formats
+
+def excel_rows(batch, serial_dates=False):
+    """
+    Converts a batch to rows of plain Python values, with None for missing values.
+    serial_dates turns datetimes into Excel date numbers, which xlsxwriter writes far
+    faster than datetime objects (the column format makes them show as dates).
+    """
+    columns = []
+    for name in batch.columns:
+        column = batch[name]
+        if serial_dates and pd.api.types.is_datetime64_any_dtype(column):
+            column = (column - EXCEL_EPOCH) / pd.Timedelta(days=1)
+        columns.append(column.astype(object).where(column.notna(), None).tolist())
+    return zip(*columns)
+
+def write_xlsx(df, path, batch_rows):
+    if len(df) + 1 > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(df)} rows do not fit in one Excel sheet; use csv, csv.gz or parquet")
+
+    if "xlsxwriter" in XLSX_WRITERS:
+        import xlsxwriter
+
+        # constant_memory flushes every row to disk as soon as the next one starts
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        sheet = workbook.add_worksheet("Anomalies")
+        for position, number_format in date_columns(df).items():
+            sheet.set_column(position, position, 18, workbook.add_format({"num_format": number_format}))
+        sheet.write_row(0, 0, list(df.columns))
+        row_number = 1
+        for batch in batches(df, batch_rows):
+            for row in excel_rows(batch, serial_dates=True):
+                sheet.write_row(row_number, 0, row)
+                row_number += 1
+        workbook.close()
+    elif "openpyxl" in XLSX_WRITERS:
+        import openpyxl
+
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Anomalies")
+        sheet.append(list(df.columns))
+        for batch in batches(df, batch_rows):
+            for row in excel_rows(batch):
+                sheet.append(row)
+        workbook.save(path)
+    else:
+        raise ImportError("Excel export needs the xlsxwriter or openpyxl package")
+
+def write_export(df, path, fmt, batch_rows=BATCH_ROWS):
+    """
+    Writes a frame in one of EXPORT_FORMATS, batch_rows rows at a time. The file is written
+    under a temporary name and renamed when complete, so a half-written report never shows up.
+    Returns the path.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    part_path = path + ".part"
+    try:
+        if fmt == "csv":
+            with open(part_path, "w", newline="", encoding="utf-8") as f:
+                write_csv(df, f, batch_rows)
+        elif fmt == "csv.gz":
+            with gzip.open(part_path, "wt", newline="", encoding="utf-8", compresslevel=GZIP_LEVEL) as f:
+                write_csv(df, f, batch_rows)
+        elif fmt == "parquet":
+            write_parquet(df, part_path, batch_rows)
+        else:
+            write_xlsx(df, part_path, batch_rows)
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return path
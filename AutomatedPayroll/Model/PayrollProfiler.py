@@ -0,0 +1,312 @@
+import contextvars
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Optional: a readable call tree for single-request captures; cProfile is used without it
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# === Runtime output goes to the user's cache folder, not next to the app ===
+def user_cache_dir():
+    """
+    Per-user folder for files written at runtime: %LOCALAPPDATA% on Windows, else the XDG cache.
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "AutomatedPayroll")
+
+# === Output layout ===
+# profiles/
+#     trace.jsonl                        <- one JSON line per top-level stage, with its nested stages
+#     search_2025-07-14T10-32-05.prof    <- single-request captures (.html with pyinstrument)
+#     startup.jsonl                      <- one JSON line per app launch (see mark)
+PROFILE_DIR = os.environ.get("PAYROLL_PROFILE_DIR", os.path.join(user_cache_dir(), "profiles"))
+TRACE_LOG = os.path.join(PROFILE_DIR, "trace.jsonl")
+STARTUP_LOG = os.path.join(PROFILE_DIR, "startup.jsonl")
+# Traces are kept in memory only, unless PAYROLL_TRACE_LOG=1 (also turns on startup.jsonl)
+TRACE_LOG_ENABLED = os.environ.get("PAYROLL_TRACE_LOG", "0") == "1"
+TRACE_LOG_BYTES = 5 * 1024 * 1024
+
+# Finished top-level traces kept for the diagnostics panel
+RECENT_TRACES = 20
+
+# Stage being timed in the current thread or task; nested stages attach to it
+current = contextvars.ContextVar("payroll_stage", default=None)
+recent = deque(maxlen=RECENT_TRACES)
+lock = threading.Lock()
+# Name of the stage to capture with the profiler the next time it runs (see profile_next)
+armed = {"stage": None}
+logger = None
+# Seconds from launch to each startup milestone, logged once all of STARTUP_MARKS are in
+STARTUP_MARKS = ("imports", "window", "data", "first_search")
+startup = {"started": None, "marks": {}, "logged": False}
+
+
+def trace_logger():
+    """
+    Returns the logger writing trace.jsonl, creating it on first use.
+    """
+    global logger
+    with lock:
+        if logger is None:
+            logger = logging.getLogger("payroll.trace")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            handler = RotatingFileHandler(TRACE_LOG, maxBytes=TRACE_LOG_BYTES, backupCount=2, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        return logger
+
+def is_frame(value):
+    # By type name, so this module doesn't have to import pandas
+    return type(value).__name__ in ("DataFrame", "Series")
+
+def count_rows(value):
+    """
+    Returns the rows of a frame, or of the first frame in a tuple or list (None if there is none).
+    """
+    if is_frame(value):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        for item in value:
+            if is_frame(item):
+                return len(item)
+    return None
+
+
+# === Stages ===
+class Stage:
+    """
+    Wall time, rows in and out and cache hits/misses of one timed call, with its nested stages.
+    """
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = []
+        self.started_at = datetime.now()
+        self.seconds = None
+        self.rows_in = None
+        self.rows_out = None
+        self.cache = {}
+        self.error = None
+        self.profile = None
+
+    def note_cache(self, cache_name, hit):
+        counts = self.cache.setdefault(cache_name, {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def to_dict(self):
+        record = {
+            "stage": self.name,
+            "started": self.started_at.isoformat(timespec="milliseconds"),
+            "seconds": round(self.seconds, 6) if self.seconds is not None else None,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+        }
+        if self.cache:
+            record["cache"] = self.cache
+        if self.error:
+            record["error"] = self.error
+        if self.profile:
+            record["profile"] = self.profile
+        if self.children:
+            record["stages"] = [child.to_dict() for child in self.children]
+        return record
+
+def note_cache(cache_name, hit):
+    """
+    Records a cache hit or miss against the stage running in this thread, if any.
+    """
+    stage_record = current.get()
+    if stage_record is not None:
+        stage_record.note_cache(cache_name, hit)
+
+def set_rows(rows_in=None, rows_out=None):
+    """
+    Sets the row counts of the running stage when its arguments and result don't show them.
+    """
+    stage_record = current.get()
+    if stage_record is None:
+        return
+    if rows_in is not None:
+        stage_record.rows_in = rows_in
+    if rows_out is not None:
+        stage_record.rows_out = rows_out
+
+@contextmanager
+def stage(name, rows_in=None, profile=False):
+    """
+    Times the block as a stage. Stages opened inside it, in the same thread, are nested
+    under it; a stage with no parent is a trace of its own and is logged when it ends.
+    profile=True captures a top-level stage with the profiler (see profile_next).
+    """
+    parent = current.get()
+    record = Stage(name, parent)
+    record.rows_in = rows_in
+    if parent is not None:
+        parent.children.append(record)
+    token = current.set(record)
+
+    profiler = start_profile(name, profile) if parent is None else None
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record.seconds = time.perf_counter() - started
+        current.reset(token)
+        if profiler is not None:
+            record.profile = save_profile(name, profiler)
+        if record.rows_in is None and record.children:
+            # A filter's input is what the first stage it called handed it
+            record.rows_in = record.children[0].rows_out
+        if parent is None:
+            finish(record)
+
+def instrument(name=None):
+    """
+    Decorator timing every call of a function as a stage. Rows in are counted from the
+    frame arguments (or the nested stages), rows out from the returned frame(s).
+    """
+    def decorate(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(stage_name, rows_in=count_rows(list(args) + list(kwargs.values()))) as record:
+                result = func(*args, **kwargs)
+                if record.rows_out is None:
+                    record.rows_out = count_rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+# === Traces ===
+def finish(record):
+    trace = record.to_dict()
+    with lock:
+        recent.append(trace)
+    if TRACE_LOG_ENABLED:
+        try:
+            trace_logger().info(json.dumps(trace, default=str))
+        except OSError as e:
+            print(f"Could not write trace log: {e}")
+
+def recent_traces(name=None):
+    """
+    Returns the finished traces, newest first, optionally only those of one stage name.
+    """
+    with lock:
+        traces = list(recent)
+    return [trace for trace in reversed(traces) if name is None or trace["stage"] == name]
+
+def flatten(trace, depth=0):
+    """
+    Returns the stages of a trace as rows for a table, nested stages indented under their parent.
+    """
+    cache = trace.get("cache", {})
+    rows = [{
+        "stage": "    " * depth + trace["stage"],
+        "ms": round(trace["seconds"] * 1000, 1) if trace["seconds"] is not None else None,
+        "rows_in": trace["rows_in"],
+        "rows_out": trace["rows_out"],
+        "cache": ", ".join(f"{cache_name} {counts['hits']}/{counts['misses']}" for cache_name, counts in cache.items()),
+    }]
+    for child in trace.get("stages", []):
+        rows.extend(flatten(child, depth + 1))
+    return rows
+
+
+# === Single-request profiles ===
+def profile_next(stage_name):
+    """
+    Captures the next run of the named top-level stage with pyinstrument (if installed)
+    or cProfile, whoever starts it. The file path ends up in that trace's 'profile' field.
+    To profile one caller's run only, pass profile=True to stage instead.
+    """
+    armed["stage"] = stage_name
+
+def start_profile(name, profile=False):
+    with lock:
+        if not profile:
+            if armed["stage"] != name:
+                return None
+            armed["stage"] = None
+    if pyinstrument is not None:
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+def save_profile(name, profiler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y-%m-%dT%H-%M-%S")
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        path = os.path.join(PROFILE_DIR, f"{name}_{stamp}.prof")
+        profiler.dump_stats(path)
+    else:
+        profiler.stop()
+        path = os.path.join(PROFILE_DIR, f"{name}_{stamp}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+    print(f"Profile of '{name}' saved at: {path}")
+    return path
+
+
+# === Startup ===
+def start_clock(started=None):
+    """
+    Sets the launch time the startup marks count from (a time.perf_counter() value).
+    """
+    startup["started"] = started if started is not None else time.perf_counter()
+
+def mark(name):
+    """
+    Records the seconds from launch to a startup milestone, the first time it is reached.
+    Once every one of STARTUP_MARKS is in, the launch is appended to startup.jsonl.
+    """
+    if startup["started"] is None or name in startup["marks"]:
+        return
+    startup["marks"][name] = round(time.perf_counter() - startup["started"], 3)
+    if not startup["logged"] and all(key in startup["marks"] for key in STARTUP_MARKS):
+        startup["logged"] = True
+        log_startup()
+
+def startup_marks():
+    return dict(startup["marks"])
+
+def log_startup():
+    record = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "python": sys.version.split()[0],
+        **startup["marks"],
+    }
+    print(f"Startup times: {startup['marks']}")
+    if not TRACE_LOG_ENABLED:
+        return
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(STARTUP_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Could not write startup log: {e}")
@@ -0,0 +1,110 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Columns left out of the CSV reports, as in the GUI download
+REPORT_DROP_COLUMNS = ['id', 'discrepancy', 'scheduled_start', 'scheduled_end']
+
+# Default number of report worker processes
+REPORT_WORKERS = os.cpu_count() or 1
+
+# Classified period frames and the division index, handed to every worker once when it
+# starts (see share_frames) instead of being pickled along with each task
+shared = {}
+
+
+# === Report files ===
+# <output>/<start>_<end>/dashboard.csv
+# <output>/<start>_<end>/anomalies_all.csv
+# <output>/<start>_<end>/<division>/anomalies.csv
+# <output>/<start>_<end>/<division>/cost_center_<name>.csv
+def safe_name(name):
+    """
+    Turns a division or cost center name into a file name.
+    """
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'unnamed'
+
+def period_dir(output_dir, start_date, end_date):
+    return os.path.join(output_dir, f"{start_date}_{end_date}")
+
+def write_report_csv(df, path):
+    df.drop(columns=REPORT_DROP_COLUMNS, errors='ignore').to_csv(path, index=False)
+
+
+# === Workers ===
+def share_frames(frames, division_index):
+    """
+    Pool initializer: keeps the classified frame of every period in the worker process.
+    """
+    shared["frames"] = frames
+    shared["division_index"] = division_index
+
+def division_reports(folder, division):
+    """
+    Writes one division's anomalies.csv and per cost center CSVs for the period whose
+    report folder is given, from the shared frame. Returns the number of files written.
+    """
+    df = shared["frames"][folder]
+    division_df = df[shared["division_index"].mask(df['cost_center_id'], division)]
+    if division_df.empty:
+        return 0
+
+    division_dir = os.path.join(folder, safe_name(division))
+    os.makedirs(division_dir, exist_ok=True)
+    write_report_csv(division_df, os.path.join(division_dir, "anomalies.csv"))
+    files = 1
+
+    for center, center_df in division_df.groupby('cost_center_name', observed=True, sort=True):
+        write_report_csv(center_df, os.path.join(division_dir, f"cost_center_{safe_name(center)}.csv"))
+        files += 1
+    return files
+
+
+# === Batch reports ===
+def generate_reports(payroll, periods, anomaly, output_dir, workers=REPORT_WORKERS):
+    """
+    Writes the reports of every (start, end) pay period and returns {(start, end): files written}.
+
+    Each period is classified once, here, through the PayrollAutomation caches. The division
+    and cost center slicing and the CSV writing then fan out over a pool of worker processes,
+    one task per period and division. workers=1 runs everything in this process.
+    """
+    files = {}
+    frames = {}
+    for start_date, end_date in periods:
+        folder = period_dir(output_dir, start_date, end_date)
+        os.makedirs(folder, exist_ok=True)
+
+        payroll.create_dashboard(start_date, end_date).to_csv(os.path.join(folder, "dashboard.csv"))
+        files[(start_date, end_date)] = 1
+
+        df = payroll.filter_anomaly(anomaly, start_date, end_date)
+        if df is None or df.empty:
+            continue
+        write_report_csv(df, os.path.join(folder, "anomalies_all.csv"))
+        files[(start_date, end_date)] += 1
+
+        # Only the report columns go to the workers
+        frames[folder] = df.drop(columns=REPORT_DROP_COLUMNS, errors='ignore')
+
+    folders = {period_dir(output_dir, *period): period for period in files}
+    tasks = [(folder, division) for folder in frames for division in payroll.division_index.names]
+    if not tasks:
+        return files
+
+    if workers <= 1:
+        share_frames(frames, payroll.division_index)
+        try:
+            results = [division_reports(*task) for task in tasks]
+        finally:
+            shared.clear()
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            initializer=share_frames, initargs=(frames, payroll.division_index)
+        ) as pool:
+            results = list(pool.map(division_reports, *zip(*tasks)))
+
+    for (folder, _), written in zip(tasks, results):
+        files[folders[folder]] += written
+    return files
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+# Compact in-memory types for the shift frame returned by export():
+# - names repeat on every punch, so they are categoricals
+# - ids are downcast to the smallest integer type that holds them (nullable if the column has gaps)
+# - hours stay float64: the anomaly thresholds are compared exactly, and float32 rounding
+#   would move rows across a boundary (11.7 - 7.7 is 3.99999... in float64 but 4.0 in float32)
+# - timestamps are native datetime64 columns
+CATEGORY_COLUMNS = ['employee_name', 'cost_center_name']
+INTEGER_COLUMNS = ['id', 'user_id', 'earning_code_id', 'cost_center_id', 'pay_period_id']
+FLOAT_COLUMNS = ['actual_hours', 'scheduled_hours', 'discrepancy']
+DATETIME_COLUMNS = ['date_line', 'scheduled_start', 'scheduled_end']
+
+NULLABLE_INTEGERS = ['Int8', 'Int16', 'Int32', 'Int64']
+
+
+def compact_integers(column):
+    """
+    Downcasts an integer column to the smallest type that holds its values.
+    Columns with missing values become a nullable integer type instead of float64.
+    """
+    values = pd.to_numeric(column, errors='coerce')
+    if not values.isna().any():
+        return pd.to_numeric(values, downcast='integer')
+
+    valid = values.dropna()
+    low, high = (valid.min(), valid.max()) if not valid.empty else (0, 0)
+    for dtype in NULLABLE_INTEGERS:
+        info = np.iinfo(dtype.lower())
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values.astype('Int64')
+
+def enforce_schema(df):
+    """
+    Converts the exported shift frame to the compact schema. Columns that already have
+    the right type are left alone, so running it twice is cheap.
+    """
+    if df is None or df.empty:
+        return df
+
+    df = df.copy()
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = compact_integers(df[column])
+
+    for column in FLOAT_COLUMNS:
+        if column in df.columns and df[column].dtype != np.float64:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(np.float64)
+
+    for column in DATETIME_COLUMNS:
+        if column in df.columns and not pd.api.types.is_datetime64_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+
+    return df
+
+def memory_report(before, after):
+    """
+    Returns the deep memory usage of every column before and after enforce_schema, in MB.
+    """
+    mb = 1024 * 1024
+    report = pd.DataFrame({
+        'before_dtype': before.dtypes.astype(str),
+        'before_mb': before.memory_usage(deep=True, index=False) / mb,
+        'after_dtype': after.dtypes.astype(str),
+        'after_mb': after.memory_usage(deep=True, index=False) / mb,
+    })
+    report.loc['Total'] = ['', report['before_mb'].sum(), '', report['after_mb'].sum()]
+    return report
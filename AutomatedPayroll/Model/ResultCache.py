@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+
+from Model.PayrollProfiler import note_cache
+
+# Marks a key that is not in the cache (None is a valid cached result)
+MISSING = object()
+
+
+class ResultCache:
+    """
+    Bounded, thread-safe LRU cache for pipeline results, with hit/miss counters.
+    Hits and misses are also recorded, under the cache's name, on the running profiler stage.
+
+    When several callers ask for the same missing key at once, only the first one
+    computes it; the others wait for that result instead of recomputing it.
+    """
+
+    def __init__(self, maxsize=16, name="results"):
+        self.maxsize = maxsize
+        self.name = name
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.key_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key):
+        with self.lock:
+            value = self.entries.get(key, MISSING)
+            if value is not MISSING:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def store(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached result for key, calling compute() on a miss.
+        """
+        value = self.lookup(key)
+        if value is not MISSING:
+            note_cache(self.name, True)
+            return value
+
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                # Another caller may have finished computing it while we waited
+                value = self.lookup(key)
+                if value is not MISSING:
+                    note_cache(self.name, True)
+                    return value
+                with self.lock:
+                    self.misses += 1
+                note_cache(self.name, False)
+                value = compute()
+                self.store(key, value)
+                return value
+        finally:
+            # Also when compute() raised, so failing keys don't pile up locks
+            with self.lock:
+                self.key_locks.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,132 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from Model.PayrollProfiler import user_cache_dir
+
+# === Review snapshot layout ===
+# Reviews outlive the app, so they go to the user's folder (not next to the app, which is a
+# temporary folder in the one-file build)
+# reviews/
+#     2025-07-13_2025-07-19.parquet <- the anomalies of a pay period when it was last marked reviewed
+REVIEW_DIR = os.environ.get("PAYROLL_REVIEW_DIR", os.path.join(user_cache_dir(), "reviews"))
+
+# Columns kept per anomaly: enough to show a resolved row, which is no longer in the data
+SNAPSHOT_COLUMNS = [
+    'id', 'employee_name', 'user_id', 'date_line', 'cost_center_id', 'cost_center_name',
+    'actual_hours', 'anomaly'
+]
+# Hours that differ by less than this are the same punch (float noise from the database)
+HOURS_TOLERANCE = 1e-6
+
+# Values of the 'change' column
+NEW = 'new'
+RESOLVED = 'resolved'
+CHANGED = 'changed'
+
+
+def snapshot_path(start_date, end_date):
+    return os.path.join(REVIEW_DIR, f"{pd.Timestamp(start_date):%Y-%m-%d}_{pd.Timestamp(end_date):%Y-%m-%d}.parquet")
+
+def save_snapshot(df, start_date, end_date):
+    """
+    Stores the classified anomalies of a pay period as its last review. Returns the review time.
+    """
+    os.makedirs(REVIEW_DIR, exist_ok=True)
+    if df is None:
+        df = pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    snapshot = df.reindex(columns=SNAPSHOT_COLUMNS).astype({'id': np.int64, 'anomaly': str})
+    reviewed_at = datetime.now()
+    table = pa.Table.from_pandas(snapshot, preserve_index=False)
+    table = table.replace_schema_metadata({"reviewed_at": reviewed_at.isoformat(timespec="seconds")})
+
+    # Written under a temporary name, so a reader never sees half a snapshot
+    path = snapshot_path(start_date, end_date)
+    pq.write_table(table, path + ".part")
+    os.replace(path + ".part", path)
+    return reviewed_at
+
+def snapshot_stamp(start_date, end_date):
+    """
+    Returns the modification time of a pay period's snapshot (None if never reviewed), so
+    results computed from it can be cached until the next review.
+    """
+    try:
+        return os.stat(snapshot_path(start_date, end_date)).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def load_snapshot(start_date, end_date):
+    """
+    Returns (snapshot frame, review time) of a pay period, or (None, None) if it was never reviewed.
+    """
+    path = snapshot_path(start_date, end_date)
+    if not os.path.exists(path):
+        return None, None
+    table = pq.read_table(path)
+    reviewed_at = datetime.fromisoformat(table.schema.metadata[b"reviewed_at"].decode())
+    return table.to_pandas(), reviewed_at
+
+def diff_snapshot(previous, current):
+    """
+    Compares the anomalies of a pay period now with its last review, by punch id.
+
+    Returns one row per difference, with a 'change' column:
+    - 'new': the punch is an anomaly now but wasn't at the review
+    - 'resolved': it was an anomaly at the review and isn't anymore (fixed or deleted)
+    - 'changed': an anomaly both times, with different actual_hours or anomaly class
+    plus previous_anomaly and previous_hours. New and changed rows show the current values,
+    resolved rows the reviewed ones. No review (previous None) makes every anomaly new.
+    """
+    if current is None:
+        current = pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    if previous is None:
+        previous = pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+
+    now = current.reindex(columns=SNAPSHOT_COLUMNS).astype({'anomaly': str})
+    before = previous.reindex(columns=SNAPSHOT_COLUMNS).astype({'anomaly': str})
+    # Merged on the ids only, with the two sides aligned through their positions
+    merged = pd.merge(
+        pd.DataFrame({'id': now['id'].to_numpy(dtype=np.int64), 'now_row': np.arange(len(now))}),
+        pd.DataFrame({'id': before['id'].to_numpy(dtype=np.int64), 'before_row': np.arange(len(before))}),
+        on='id', how='outer', sort=False
+    )
+    in_now = merged['now_row'].notna().to_numpy()
+    in_before = merged['before_row'].notna().to_numpy()
+    now_rows = merged['now_row'].fillna(0).astype(np.int64).to_numpy()
+    before_rows = merged['before_row'].fillna(0).astype(np.int64).to_numpy()
+
+    both = in_now & in_before
+    now_anomaly = now['anomaly'].to_numpy()[now_rows[both]]
+    before_anomaly = before['anomaly'].to_numpy()[before_rows[both]]
+    now_hours = now['actual_hours'].to_numpy(dtype=float)[now_rows[both]]
+    before_hours = before['actual_hours'].to_numpy(dtype=float)[before_rows[both]]
+    changed = np.zeros(len(merged), dtype=bool)
+    changed[both] = (now_anomaly != before_anomaly) | (np.abs(now_hours - before_hours) > HOURS_TOLERANCE)
+
+    new_mask = in_now & ~in_before
+    resolved_mask = in_before & ~in_now
+    shown_now = new_mask | changed
+
+    columns = ['change'] + SNAPSHOT_COLUMNS + ['previous_anomaly', 'previous_hours']
+    parts = [
+        now.iloc[now_rows[shown_now]].assign(change=np.where(new_mask[shown_now], NEW, CHANGED)),
+        before.iloc[before_rows[resolved_mask]].assign(change=RESOLVED),
+    ]
+    parts = [part for part in parts if not part.empty]
+    if not parts:
+        return pd.DataFrame(columns=columns)
+    rows = pd.concat(parts, ignore_index=True)
+
+    # The reviewed values of changed and resolved rows
+    previous_values = before.astype({'id': np.int64}).set_index('id')[['anomaly', 'actual_hours']]
+    rows['id'] = rows['id'].astype(np.int64)
+    rows['previous_anomaly'] = rows['id'].map(previous_values['anomaly'])
+    rows['previous_hours'] = rows['id'].map(previous_values['actual_hours'])
+    rows.loc[rows['change'] == RESOLVED, 'anomaly'] = None
+
+    return rows[columns].sort_values(['change', 'date_line', 'employee_name'], kind='stable').reset_index(drop=True)
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# A shift is matched to a punch when the punch covers at least this share of it: a split
+# shift matches only the punch worked in it, both halves of a shift cut at midnight match the
+# punch that spans them, and the few minutes a punch shares with the previous night's shift
+# don't count. A punch covering no shift that much (it left early, or is one of the punches
+# of a 24-hour shift) matches the one shift it overlaps most.
+MIN_OVERLAP_SHARE = 0.5
+# Shifts are looked up this many days either side of the punches, for shifts crossing midnight
+NEIGHBOUR_DAYS = 1
+# Seconds per user in the combined (user, time) sort key, enough for epoch seconds until 2500
+USER_SPAN = 2 ** 34
+DAY_SECONDS = 24 * 3600
+
+
+def as_datetimes(values):
+    """
+    Returns a date or timestamp column as a datetime64[ns] array (NaT where it is not set).
+    """
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_dtype(values):
+        values = pd.to_datetime(values, errors='coerce', cache=False)
+    return values.to_numpy(dtype='datetime64[ns]')
+
+def epoch_seconds(values):
+    """
+    Returns whole epoch seconds of a timestamp column (as the database's seconds_between
+    counts them), and a mask of the values that are set.
+    """
+    timestamps = as_datetimes(values)
+    valid = ~np.isnat(timestamps)
+    seconds = np.zeros(len(timestamps), dtype=np.int64)
+    seconds[valid] = timestamps[valid].astype(np.int64) // 10 ** 9
+    return seconds, valid
+
+def midnight_blocks(user, start, end):
+    """
+    Joins the rows of a shift stored as one row per calendar day: a row that starts at
+    midnight, right where the same user's previous row ends, continues that shift. Returns
+    the row of the first and of the last piece of every shift.
+    """
+    order = np.lexsort((start, user))
+    if len(order) == 0:
+        return order, order
+    user, start, end = user[order], start[order], end[order]
+    continues = np.zeros(len(order), dtype=bool)
+    continues[1:] = (user[1:] == user[:-1]) & (start[1:] == end[:-1]) & (start[1:] % DAY_SECONDS == 0)
+    first = np.flatnonzero(~continues)
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    return order[first], order[last]
+
+def overlapping_pairs(punch_start, punch_end, shift_start, shift_end):
+    """
+    Returns (punch index, shift index, overlap seconds) for every punch and shift that
+    overlap. Starts and ends are sort keys with the user folded in, so only one user's
+    shifts can overlap a punch. Linear in punches + shifts + pairs: the shifts are sorted
+    once and every punch finds its candidates with two binary searches.
+    """
+    order = np.argsort(shift_start, kind='stable')
+    starts = shift_start[order]
+    # Running max of the ends: sorted, so it can be searched even when shifts overlap each other
+    ends_max = np.maximum.accumulate(shift_end[order]) if len(order) else shift_end[order]
+
+    # Candidates of a punch: shifts that start before it ends, after the last shift that
+    # (with every earlier one) ended before it started
+    lo = np.searchsorted(ends_max, punch_start, side='right')
+    hi = np.searchsorted(starts, punch_end, side='left')
+    counts = np.maximum(hi - lo, 0)
+
+    punch_index = np.repeat(np.arange(len(punch_start)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    shift_index = order[np.repeat(lo, counts) + offsets]
+
+    overlap = (
+        np.minimum(punch_end[punch_index], shift_end[shift_index])
+        - np.maximum(punch_start[punch_index], shift_start[shift_index])
+    )
+    keep = overlap > 0
+    return punch_index[keep], shift_index[keep], overlap[keep]
+
+def day_schedule(punches, shifts):
+    """
+    The (user_id, date_line) match: the earliest start and latest end of the user's shifts
+    on the punch's date. Returns scheduled_start, scheduled_end and scheduled_seconds.
+    """
+    days = pd.DataFrame({
+        'user_id': shifts['user_id'].to_numpy(),
+        'date_line': as_datetimes(shifts['date_line']),
+        'start_time': as_datetimes(shifts['start_time']),
+        'end_time': as_datetimes(shifts['end_time']),
+    }).groupby(['user_id', 'date_line'], sort=False).agg(
+        scheduled_start=('start_time', 'min'), scheduled_end=('end_time', 'max')
+    )
+    keys = pd.MultiIndex.from_arrays([punches['user_id'].to_numpy(), as_datetimes(punches['date_line'])])
+    matched = days.reindex(keys)
+
+    start, start_valid = epoch_seconds(matched['scheduled_start'])
+    end, end_valid = epoch_seconds(matched['scheduled_end'])
+    seconds = np.where(start_valid & end_valid, end - start, np.nan)
+    return as_datetimes(matched['scheduled_start']), as_datetimes(matched['scheduled_end']), seconds
+
+def match_shifts(punches, shifts):
+    """
+    Matches every punch (user_id, date_line, punch_start, punch_end) to the scheduled shifts
+    (user_id, date_line, start_time, end_time) its clock times overlap, whatever their date,
+    so split shifts and shifts crossing midnight get the hours actually scheduled around them.
+
+    A punch's scheduled_start / scheduled_end are the first start and last end of its
+    matched shifts (see MIN_OVERLAP_SHARE) and scheduled_seconds the time they cover, with
+    shifts entered twice counted once. A shift stored as one row per calendar day counts as
+    one shift (see midnight_blocks). Punches without a start time, or that overlap no shift,
+    keep the day match: all the user's shifts on the punch's date_line. Returns a frame
+    aligned with punches.
+    """
+    scheduled_start, scheduled_end, scheduled_seconds = day_schedule(punches, shifts)
+
+    users, _ = pd.factorize(pd.concat([punches['user_id'], shifts['user_id']], ignore_index=True))
+    punch_user, shift_user = users[:len(punches)].astype(np.int64), users[len(punches):].astype(np.int64)
+
+    punch_start, start_valid = epoch_seconds(punches['punch_start'])
+    punch_end, end_valid = epoch_seconds(punches['punch_end'])
+    # A punch without a duration (no punch out, or 0 hours) is matched at its start time
+    punch_end = np.where(end_valid & (punch_end > punch_start), punch_end, punch_start + 1)
+    punch_rows = np.flatnonzero(start_valid)
+    shift_start, start_valid = epoch_seconds(shifts['start_time'])
+    shift_end, end_valid = epoch_seconds(shifts['end_time'])
+    shift_rows = np.flatnonzero(start_valid & end_valid & (shift_end > shift_start))
+    first, last = midnight_blocks(shift_user[shift_rows], shift_start[shift_rows], shift_end[shift_rows])
+    first, last = shift_rows[first], shift_rows[last]
+    # Every shift from now on is a block of rows, from its first piece's start to its last piece's end
+    block_start, block_end = shift_start[first], shift_end[last]
+
+    punch_index, block_index, overlap = overlapping_pairs(
+        punch_user[punch_rows] * USER_SPAN + punch_start[punch_rows],
+        punch_user[punch_rows] * USER_SPAN + punch_end[punch_rows],
+        shift_user[first] * USER_SPAN + block_start,
+        shift_user[first] * USER_SPAN + block_end,
+    )
+    punch_index = punch_rows[punch_index]
+
+    if len(punch_index):
+        same_day = (
+            as_datetimes(punches['date_line'])[punch_index] == as_datetimes(shifts['date_line'])[first[block_index]]
+        )
+        pairs = pd.DataFrame({
+            'punch': punch_index,
+            'block': block_index,
+            'overlap': overlap,
+            'same_day': same_day,
+            'covered': overlap >= MIN_OVERLAP_SHARE * (block_end - block_start)[block_index],
+        })
+        # Punches covering no shift enough keep their best overlap, a shift of their own day first
+        pairs['any_covered'] = pairs.groupby('punch')['covered'].transform('any')
+        best = pairs[~pairs['any_covered']].sort_values(
+            ['punch', 'overlap', 'same_day'], ascending=[True, False, False], kind='stable'
+        ).drop_duplicates('punch')
+        pairs = pd.concat([pairs[pairs['covered']], best])
+
+        # Time covered by the matched shifts: each shift adds what lies past the ones before it
+        pairs['start'] = block_start[pairs['block'].to_numpy()]
+        pairs['end'] = block_end[pairs['block'].to_numpy()]
+        pairs = pairs.sort_values(['punch', 'start'], kind='stable')
+        covered_until = pairs.groupby('punch')['end'].cummax().groupby(pairs['punch']).shift(1)
+        pairs['seconds'] = (pairs['end'] - np.maximum(pairs['start'], covered_until.fillna(pairs['start']))).clip(lower=0)
+        pairs['start_time'] = as_datetimes(shifts['start_time'])[first[pairs['block'].to_numpy()]]
+        pairs['end_time'] = as_datetimes(shifts['end_time'])[last[pairs['block'].to_numpy()]]
+
+        matched = pairs.groupby('punch', sort=False).agg(
+            start=('start_time', 'min'), end=('end_time', 'max'), seconds=('seconds', 'sum')
+        )
+        rows = matched.index.to_numpy()
+        scheduled_start[rows] = matched['start'].to_numpy()
+        scheduled_end[rows] = matched['end'].to_numpy()
+        scheduled_seconds[rows] = matched['seconds'].to_numpy()
+
+    return pd.DataFrame({
+        'scheduled_start': scheduled_start,
+        'scheduled_end': scheduled_end,
+        'scheduled_seconds': scheduled_seconds,
+    }, index=punches.index)
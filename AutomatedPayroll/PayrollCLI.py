@@ -0,0 +1,149 @@
+# PayrollCLI.py
+"""
+Command line tools for the payroll data, for jobs that don't need the GUI.
+
+    python PayrollCLI.py backfill --start 2025-01-01 --end 2025-03-31
+    python PayrollCLI.py report --recent 2 --output /srv/payroll_reports
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Make the Model package importable when run from another directory
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+from Model.AnomalyRules import load_rules
+from Model.PayrollAutomation import MIN_DISCREPANCY, PayrollAutomation
+from Model.PayrollConnection import configure, pool_metrics
+from Model.PayrollReports import REPORT_WORKERS, generate_reports
+from Model.PayrollSQL import STREAM_CHUNKSIZE, stream_export
+
+
+# === Backfill ===
+class AnomalySummary:
+    """
+    Running anomaly counts over the chunks of a streamed export, with the same
+    candidate, exemption and 'No anomaly' rules as the GUI's anomaly table.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.counts = pd.Series(0, index=rules.labels, dtype='int64')
+        self.chunks = 0
+
+    def add(self, df):
+        self.chunks += 1
+        candidates = df[df['discrepancy'].abs() > MIN_DISCREPANCY]
+        if candidates.empty:
+            return
+        candidates = candidates.assign(anomaly=self.rules.classify(candidates))
+        candidates = candidates[~self.rules.exempt(candidates)]
+        counts = candidates['anomaly'].astype(str).value_counts()
+        self.counts += counts.reindex(self.counts.index, fill_value=0)
+
+def backfill(args):
+    """
+    Streams a date range into the on-disk cache and prints the anomaly counts for it.
+    """
+    summary = AnomalySummary(load_rules())
+    started = time.perf_counter()
+
+    def on_chunk(df):
+        summary.add(df)
+        print(f"  chunk {summary.chunks}: {len(df)} rows through {df['date_line'].max():%Y-%m-%d}")
+
+    print(f"Backfilling {args.start} to {args.end} in chunks of {args.chunksize} rows...")
+    totals = stream_export(args.start, args.end, chunksize=args.chunksize, on_chunk=on_chunk)
+    print(f"Wrote {totals['rows']} rows over {totals['days']} day(s) in {time.perf_counter() - started:.1f}s")
+    print(f"Connection pool: {pool_metrics()}")
+    print(summary.counts.to_frame('rows').to_string())
+
+
+# === Reports ===
+def report_periods(args, calendar):
+    """
+    Returns the (start, end) date pairs asked for on the command line, newest first.
+    --recent counts back from the newest pay period in the data (see PayPeriodCalendar).
+    """
+    if args.period:
+        return [tuple(period) for period in args.period]
+    return calendar.periods(args.recent, complete=not args.include_current)
+
+def report(args):
+    """
+    Loads the data once, then writes the dashboard and the anomaly CSVs of every pay period.
+    """
+    started = time.perf_counter()
+
+    print("Loading payroll data...")
+    payroll = PayrollAutomation()
+    load_seconds = time.perf_counter() - started
+    print(f"Loaded {len(payroll.shift_data_df)} rows in {load_seconds:.1f}s")
+    periods = report_periods(args, payroll.calendar)
+
+    reports_started = time.perf_counter()
+    files = generate_reports(payroll, periods, args.anomaly, args.output, workers=args.workers)
+    reports_seconds = time.perf_counter() - reports_started
+
+    print(f"Reports written to {os.path.abspath(args.output)}")
+    print(f"{'pay period':<25} {'files':>6}")
+    for (start_date, end_date), written in files.items():
+        period = f"{start_date} - {end_date}"
+        print(f"{period:<25} {written:>6}")
+    print(f"Reports {reports_seconds:.1f}s on {args.workers} worker(s)")
+    print(f"Load {load_seconds:.1f}s, total {time.perf_counter() - started:.1f}s")
+    print(f"Result caches: {payroll.cache_stats()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Payroll data tools")
+    parser.add_argument("--database-url", help="connect here instead of the default database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill_parser = commands.add_parser(
+        "backfill", help="stream a date range into the on-disk cache (kept outside the rolling window)"
+    )
+    backfill_parser.add_argument("--start", required=True, help="first day, YYYY-MM-DD")
+    backfill_parser.add_argument("--end", required=True, help="last day, YYYY-MM-DD")
+    backfill_parser.add_argument("--chunksize", type=int, default=STREAM_CHUNKSIZE, help="rows read per chunk")
+    backfill_parser.set_defaults(func=backfill)
+
+    report_parser = commands.add_parser(
+        "report", help="write the dashboard and anomaly CSVs per division and cost center for pay periods"
+    )
+    report_parser.add_argument(
+        "--period", nargs=2, action="append", metavar=("START", "END"),
+        help="pay period to report on, YYYY-MM-DD YYYY-MM-DD (repeatable; overrides --recent)"
+    )
+    report_parser.add_argument("--recent", type=int, default=1, help="number of recent complete pay periods")
+    report_parser.add_argument(
+        "--include-current", action="store_true", help="count the current, unfinished pay period in --recent"
+    )
+    report_parser.add_argument(
+        "--anomaly", default="All", choices=["All"] + load_rules().labels, help="only report this anomaly"
+    )
+    report_parser.add_argument(
+        "--workers", type=int, default=REPORT_WORKERS, help="processes writing the division and cost center reports"
+    )
+    report_parser.add_argument(
+        "--output", default=str(Path.home() / "Downloads" / "payroll_reports"), help="folder to write the reports to"
+    )
+    report_parser.set_defaults(func=report)
+
+    args = parser.parse_args(argv)
+    if args.database_url:
+        configure(args.database_url)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    # The report workers are separate processes; needed if this is ever frozen
+    multiprocessing.freeze_support()
+    main()
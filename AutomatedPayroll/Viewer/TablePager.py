@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+class TablePager:
+    """
+    Serves a DataFrame to a Quasar table one page at a time (server-side pagination).
+
+    Filtering and sorting run on the in-memory frame; only the rows of the requested page
+    are converted to JSON-ready dicts. The last filter mask and sort order are kept, so
+    paging through the same view does not redo them.
+    """
+
+    def __init__(self, df, hidden=()):
+        self.df = df.reset_index(drop=True)
+        self.hidden = set(hidden)
+        self.filter_key = None
+        self.filter_positions = np.arange(len(self.df))
+        self.order_key = None
+        self.order = self.filter_positions
+
+    def columns(self):
+        """
+        Column definitions for ui.table, without the hidden columns.
+        """
+        return [
+            {'name': name, 'label': name, 'field': name, 'sortable': True, 'align': 'left'}
+            for name in self.df.columns if name not in self.hidden
+        ]
+
+    def filtered(self, filters):
+        """
+        Returns the row positions matching every {column: text} filter (case-insensitive substring).
+        """
+        filters = {column: text for column, text in (filters or {}).items() if text}
+        key = tuple(sorted(filters.items()))
+        if key == self.filter_key:
+            return self.filter_positions
+
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, text in filters.items():
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Match against the few categories, then map back through the codes
+                hits = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+                codes = values.cat.codes.to_numpy()
+                mask &= (codes >= 0) & np.append(hits, False)[codes]
+            else:
+                mask &= values.astype(str).str.contains(text, case=False, regex=False).to_numpy()
+
+        self.filter_key = key
+        self.filter_positions = np.flatnonzero(mask)
+        self.order_key = None
+        return self.filter_positions
+
+    def ordered(self, positions, sort_by, descending):
+        """
+        Returns the filtered row positions in sort order.
+        """
+        if not sort_by or sort_by not in self.df.columns:
+            return positions
+
+        key = (self.filter_key, sort_by, descending)
+        if key != self.order_key:
+            values = self.df[sort_by].iloc[positions].reset_index(drop=True)
+            sorted_values = values.sort_values(ascending=not descending, kind='stable', na_position='last')
+            self.order = positions[sorted_values.index.to_numpy()]
+            self.order_key = key
+        return self.order
+
+    def page(self, page=1, rows_per_page=50, sort_by=None, descending=False, filters=None):
+        """
+        Returns (rows, total) for one page: the page's rows as dicts and the filtered row count.
+        """
+        positions = self.ordered(self.filtered(filters), sort_by, descending)
+        total = len(positions)
+        if rows_per_page:
+            start = (max(page, 1) - 1) * rows_per_page
+            positions = positions[start:start + rows_per_page]
+        return self.to_rows(self.df.iloc[positions]), total
+
+    def to_rows(self, page_df):
+        """
+        Converts rows to JSON-ready dicts: dates as text, categories as strings, missing values as None.
+        """
+        columns = {}
+        for name in page_df.columns:
+            column = page_df[name]
+            if pd.api.types.is_datetime64_any_dtype(column):
+                present = column.dropna()
+                date_only = (present == present.dt.normalize()).all()
+                values = column.dt.strftime('%Y-%m-%d' if date_only else '%Y-%m-%d %H:%M')
+            else:
+                values = column.astype(object)
+            columns[name] = values.where(column.notna(), None).tolist()
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
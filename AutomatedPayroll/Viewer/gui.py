@@ -1,216 +1,649 @@
-# gui.py
-
-from nicegui import ui
-from datetime import datetime, timedelta
-import sys
-import os
-from pathlib import Path
-
-# === For PyInstaller-compatible resource access ===
-def resource_path(relative_path):
-    """Get absolute path to resource (works for dev and PyInstaller)."""
-    try:
-        base_path = sys._MEIPASS
-    except AttributeError:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# Append parent directory to path for importing Model
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from Model.PayrollAutomation import PayrollAutomation
-
-# Initialize
-pa = PayrollAutomation()
-dates = []
-dataframe = []
-
-# === UI Header with logo ===
-with ui.header().classes('justify-center').props('height-hint=100'):
-    with ui.tabs():
-        try:
-            image_path = resource_path('BrewsterTwo.png')
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image not found at: {image_path}")
-            ui.image(image_path).classes('w-64')
-        except Exception as e:
-            ui.label(f"Failed to load logo: {e}").classes("text-red-500 text-sm")
-
-# === Pay period generator ===
-def pay_periods_month():
-    today = datetime.today()
-    days_since_saturday = (today.weekday() + 2) % 7
-    last_saturday = today - timedelta(days=days_since_saturday)
-
-    pay_periods = []
-    for i in range(4):
-        end_date = last_saturday - timedelta(weeks=i)
-        start_date = end_date - timedelta(days=6)
-        pay_periods.append(f'{start_date:%Y-%m-%d} - {end_date:%Y-%m-%d}')
-
-    pay_periods.insert(0, f'{last_saturday:%Y-%m-%d} - {today:%Y-%m-%d}')
-    return pay_periods
-
-pay_periods = pay_periods_month()
-selected_period = {'value': pay_periods[0]}
-
-def get_cost_centers_by_division(division, start_date, end_date, anomaly):
-    df = pa.filter_division(anomaly, start_date, end_date, division)
-    if df is None or df.empty:
-        return ['All']
-
-    if division == 'All':
-        return ['All'] + sorted(df['cost_center_name'].unique().tolist())
-
-    if division == 'Other':
-        all_known_ids = {id for ids in pa.Divisions.values() for id in ids}
-        filtered = df[~df['cost_center_id'].isin(all_known_ids)]
-    else:
-        if division not in pa.Divisions:
-            return ['All']
-        division_ids = pa.Divisions[division]
-        filtered = df[df['cost_center_id'].isin(division_ids)]
-
-    return ['All'] + sorted(filtered['cost_center_name'].unique().tolist())
-
-# === Download handler ===
-def on_download_click():
-    dates = get_selected_period()
-    start_date, end_date = dates.split(' - ')
-    anomaly = get_filter()
-    division = get_division()
-    center = get_center()
-    # df = pa.filter_anomaly(anomaly, start_date, end_date)
-    # super_dash = pa.create_dashboard(start_date, end_date)
-    # df = pa.filter_division(anomaly, start_date, end_date, division)
-    df = pa.filter_cost_centers(anomaly, start_date, end_date, division, center)
-
-    if df is not None and not df.empty:
-        export_df = df.drop(columns=[
-            'id', 
-            'date', 'discrepancy', 'scheduled_start', 'scheduled_end'
-        ], errors='ignore')
-        filename = f'anomaly_report_{start_date}_{end_date}.csv'
-        full_path = os.path.join(str(Path.home() / "Downloads"), filename)
-        export_df.to_csv(full_path, index=False)
-        ui.notify(f'CSV saved at: {full_path}')
-    else:
-        ui.notify("No data to export", type="warning")
-
-# === Search handler ===
-def on_search_click():
-    dates = get_selected_period()
-    anomaly = get_filter()
-    division = get_division()
-    start_date, end_date = dates.split(' - ')
-    center = get_center()
-    # Get data
-    # df = pa.filter_division(anomaly, start_date, end_date, division)
-    df = pa.filter_cost_centers(anomaly, start_date, end_date, division, center)
-    super_dash = pa.create_dashboard(start_date, end_date)
-
-    # Cleanup
-    table_container.clear()
-    dashboard_container.clear()
-
-    # === Anomaly Table ===
-    with table_container:
-        if df is not None and not df.empty:
-            df.drop(columns=['id', 'earning_code_id', 'date', 'discrepancy', 'scheduled_start', 'scheduled_end'], inplace=True, errors='ignore')
-            ui.label("Anomaly Data").classes("text-lg font-semibold mb-2")
-            ui.table.from_pandas(df).classes('w-full max-h-[70vh] overflow-auto').props('striped bordered hoverable dense wrap-cells')
-        else:
-            ui.label("No anomalies found for this pay period.").classes("text-red-700 font-semibold")
-
-        # === Dashboard Table ===
-        with dashboard_container:
-            if super_dash is not None and not super_dash.empty:
-                ui.label("Dashboard Summary").classes("text-lg font-semibold mt-6 mb-2")
-
-                # Make sure anomaly names (index) show up as a column
-                super_dash_display = super_dash.reset_index().rename(columns={'index': 'Anomaly'})
-
-                ui.table.from_pandas(super_dash_display).classes(
-                    'w-full max-h-[60vh] overflow-auto'
-                ).props('striped bordered hoverable dense wrap-cells')
-            else:
-                ui.label("No dashboard summary data available.").classes("text-gray-700 font-semibold")
-
-# === UI layout ===
-with ui.column().classes('w-full p-4 gap-4'):
-    with ui.row().classes('w-full justify-between items-center'):
-        # === Pay Period Dropdown ===
-        ui.label('Pay Period').classes('text-sm font-semibold')
-        ui.select(
-            options=pay_periods,
-            value=selected_period['value'],
-            with_input=True,
-            on_change=lambda e: selected_period.update({'value': e.value})
-        ).classes('w-60')
-
-        # === Anomaly Dropdown ===
-        anomalies = ['All','Shift is at least 4 hours longer than scheduled', 'Forgot to clock out for at least 10 hours', 'Clocked out at least 90 minutes early', 'ALS/IFT earning code assigned to 911 cost center',
-                       'Did not punch in/PTO']
-        selected_anomaly = {'value': anomalies[0]}
-        ui.label('Anomaly').classes('text-sm font-semibold')
-        ui.select(
-            options=anomalies,
-            value=selected_anomaly['value'],
-            with_input=True,
-            on_change=lambda e: selected_anomaly.update({'value': e.value})
-        ).classes('w-60')
-
-        # === Division Dropwdown === 
-        division_names = ['All', 'Division 1', 'Division 2', 'Division 3', 'Division 4', 'Division 5', 'Division 6', 'Division 7', 'Florida', 'Other']
-        selected_division = {'value': division_names[0]}
-        ui.label('Division').classes('text-sm font-semibold')
-        ui.select(
-            options=division_names,
-            value=selected_division['value'],
-            with_input=True,
-            on_change=lambda e: selected_division.update({'value': e.value})
-        ).classes('w-60')
-
-                # === Cost Center Dropdown ===
-        # Get cost centers dynamically based on selected division
-        cost_centers_tuples = pa.get_cost_centers(selected_division['value'])
-        cost_center_options = ['All'] + [name for _, name in cost_centers_tuples]
-
-        selected_cost_center = {'value': cost_center_options[0]}
-
-        ui.label('Cost Center').classes('text-sm font-semibold')
-        ui.select(
-            options=cost_center_options,
-            value=selected_cost_center['value'],
-            with_input=True,
-            on_change=lambda e: selected_cost_center.update({'value': e.value})
-        ).classes('w-60')
-
-
-        # === Buttons ===
-        ui.button('Download CSV', on_click=on_download_click).classes('w-40')
-        ui.button("Search", on_click=on_search_click).classes('w-40')
-
-
-    table_container = ui.column().classes('w-full h-full')
-    dashboard_container = ui.column().classes('w-full h-full')
-
-
-
-
-    def get_selected_period():
-        return selected_period['value']
-    
-    def get_filter():
-        return selected_anomaly['value']
-    
-    def get_division():
-        return selected_division['value']
-    
-    def get_center():
-        return selected_cost_center['value']
-    
-
-# === App launcher ===
-if __name__ in {"__main__", "__mp_main__"}:
-    ui.run(native=True, title='Brewster Finance')
+# gui.py
+
+import time
+# Launch time, the startup marks count from it (see PayrollProfiler.mark)
+STARTED = time.perf_counter()
+
+from nicegui import app, run, ui
+import argparse
+import asyncio
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+# === For PyInstaller-compatible resource access ===
+def resource_path(relative_path):
+    """Get absolute path to resource (works for dev and PyInstaller)."""
+    try:
+        base_path = sys._MEIPASS
+    except AttributeError:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# Append parent directory to path for importing Model
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Only light modules here, so the window opens without waiting for pandas, pyarrow and
+# SQLAlchemy: the data modules are imported by load_payroll, in the background
+from Model.PayrollReports import REPORT_DROP_COLUMNS
+from Model.PayrollProfiler import (
+    count_rows, flatten, instrument, mark, recent_traces, stage, start_clock, startup_marks
+)
+
+start_clock(STARTED)
+mark('imports')
+
+# Rows sent to the browser per page of the anomaly table
+ROWS_PER_PAGE = 50
+# Pay periods in the dropdown (any of them can be searched) and in the trend
+PERIOD_OPTIONS = 53
+TREND_PERIODS = 5
+# Pay periods the repeat offender ranking can look back over, with their labels
+HISTORY_PERIODS = {5: 'Last 5 pay periods', 13: 'Last 13 pay periods', 26: 'Last 26 pay periods', 53: 'Last year'}
+# Minutes between database syncs in server mode
+REFRESH_MINUTES = float(os.environ.get('PAYROLL_REFRESH_MINUTES', 30))
+
+# === Shared data ===
+# One PayrollAutomation for every connected client, loaded in the background once the app
+# is up (see load_data) and swapped for a fresh one on every scheduled refresh in server mode.
+# Everything a client selects or searches lives in its own page (see index).
+data = {'payroll': None, 'formats': ['csv'], 'error': None, 'loaded_at': None}
+data_ready = asyncio.Event()
+# Callbacks of the open pages, run whenever the shared data is replaced (see index)
+data_listeners = set()
+# server=True: shared over the network, downloads go to the browser instead of ~/Downloads
+settings = {'server': False}
+
+# === Background data load ===
+def load_payroll():
+    """
+    Imports the data modules and loads the shared PayrollAutomation; runs in a worker thread.
+    """
+    from Model.PayrollAutomation import shared_payroll
+    from Model.PayrollExport import export_formats
+    return shared_payroll(), export_formats()
+
+async def load_data():
+    """
+    Loads the payroll data off the event loop, so the window opens right away.
+    A thread rather than run.cpu_bound: a process would have to pickle the whole frame back.
+    """
+    try:
+        data['payroll'], data['formats'] = await run.io_bound(load_payroll)
+        data['loaded_at'] = datetime.now()
+    except Exception as e:
+        data['error'] = e
+    data_ready.set()
+    mark('data')
+
+def sync_payroll():
+    from Model.PayrollAutomation import refresh_shared
+    return refresh_shared()
+
+async def refresh_data():
+    """
+    Scheduled database sync (server mode). Clients keep searching the old data until the
+    new one is ready; searches started after that use the new one. If the first load
+    failed, it is tried again instead. The open pages are told about the new data.
+    """
+    if not data_ready.is_set():
+        return
+    try:
+        if data['payroll'] is None:
+            data['payroll'], data['formats'] = await run.io_bound(load_payroll)
+        else:
+            data['payroll'] = await run.io_bound(sync_payroll)
+        data['error'] = None
+        data['loaded_at'] = datetime.now()
+        print(f"Payroll data refreshed at {data['loaded_at']:%Y-%m-%d %H:%M}")
+    except Exception as e:
+        # The old data (or the load error) stays up; the next refresh tries again
+        print(f"Scheduled refresh failed: {e}")
+        return
+
+    for listener in list(data_listeners):
+        listener()
+
+app.on_startup(load_data)
+app.on_connect(lambda: mark('window'))
+
+def show_loading(container, message):
+    container.clear()
+    with container:
+        with ui.row().classes('items-center gap-2'):
+            ui.spinner(size='lg')
+            ui.label(message).classes('text-gray-700')
+
+# === Download handler ===
+@instrument('download')
+def write_report(payroll, last_search, anomaly, start_date, end_date, division, center, fmt, folder=None, changes=False):
+    """
+    Writes the report in the chosen format; runs in a worker thread. Reuses the frame of the
+    last search when the filters haven't changed. changes=True writes the changes since the
+    last review instead of every anomaly. Returns the file path, or None if there is no data.
+    """
+    from Model.PayrollExport import export_path, write_export
+
+    key = (anomaly, start_date, end_date, division, center, changes)
+    if last_search['key'] == key and last_search['payroll'] is payroll:
+        df = last_search['df']
+    elif changes:
+        df = payroll.filter_changes(anomaly, start_date, end_date, division, center)
+    else:
+        df = payroll.filter_cost_centers(anomaly, start_date, end_date, division, center)
+    if df is None or df.empty:
+        return None
+
+    # Not inplace: df is shared with the result cache
+    export_df = df.drop(columns=REPORT_DROP_COLUMNS, errors='ignore')
+    name = f'anomaly_changes_{start_date}_{end_date}' if changes else f'anomaly_report_{start_date}_{end_date}'
+    full_path = export_path(name, fmt, folder)
+    return write_export(export_df, full_path, fmt)
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+# === Anomaly table (server-side pagination) ===
+def render_anomaly_table(df):
+    """
+    Shows the anomaly rows with server-side paging, sorting and column filtering:
+    only the visible page is serialized and sent to the browser.
+    """
+    from Viewer.TablePager import TablePager
+
+    pager = TablePager(df, hidden=['id'])
+    filters = {}
+    rows, total = pager.page(1, ROWS_PER_PAGE)
+
+    with ui.row().classes('items-center gap-2'):
+        filter_column = ui.select(
+            options=[column['name'] for column in pager.columns()],
+            value='employee_name' if 'employee_name' in df.columns else None,
+            label='Filter column',
+            on_change=lambda e: on_filter_change()
+        ).classes('w-48')
+        filter_text = ui.input(label='Contains', on_change=lambda e: on_filter_change()).classes('w-60')
+
+    table = ui.table(
+        columns=pager.columns(), rows=rows, row_key='id',
+        pagination={'page': 1, 'rowsPerPage': ROWS_PER_PAGE, 'rowsNumber': total, 'sortBy': None, 'descending': False}
+    ).classes('w-full max-h-[70vh] overflow-auto').props('striped bordered hoverable dense wrap-cells')
+
+    def show_page(pagination):
+        rows, total = pager.page(
+            pagination.get('page', 1), pagination.get('rowsPerPage', ROWS_PER_PAGE),
+            pagination.get('sortBy'), pagination.get('descending', False), filters
+        )
+        table.rows = rows
+        table.pagination = dict(pagination, rowsNumber=total)
+        table.update()
+
+    def on_filter_change():
+        filters.clear()
+        if filter_column.value and filter_text.value:
+            filters[filter_column.value] = filter_text.value
+        show_page(dict(table.pagination, page=1))
+
+    # Quasar asks for a new page whenever the user pages or sorts
+    table.on('request', lambda e: show_page(e.args['pagination']))
+
+# === Diagnostics panel ===
+def refresh_diagnostics(container):
+    """
+    Shows the stages of the last search, render, download and ranking, the result cache counters
+    and the connection pool status.
+    """
+    from Model.PayrollConnection import pool_metrics
+
+    container.clear()
+    with container:
+        ui.label(f"Startup (seconds from launch): {startup_marks()}").classes('text-sm text-gray-700')
+        if data['loaded_at'] is not None:
+            ui.label(f"Data loaded at {data['loaded_at']:%Y-%m-%d %H:%M}").classes('text-sm text-gray-700')
+        for name in ('search', 'render', 'download', 'rollup'):
+            traces = recent_traces(name)
+            if not traces:
+                continue
+            trace = traces[0]
+            ui.label(f"Last {name}: {trace['seconds'] * 1000:.0f} ms at {trace['started']}").classes('text-sm font-semibold')
+            if trace.get('profile'):
+                ui.label(f"Profile saved at: {trace['profile']}").classes('text-sm text-gray-700')
+            ui.table(
+                columns=[{'name': key, 'label': key, 'field': key, 'align': 'left'} for key in ('stage', 'ms', 'rows_in', 'rows_out', 'cache')],
+                rows=flatten(trace), row_key='stage'
+            ).classes('w-full').props('dense flat bordered')
+
+        if data['payroll'] is not None:
+            ui.label(f"Result caches: {data['payroll'].cache_stats()}").classes('text-sm text-gray-700')
+        ui.label(f"Connection pool: {pool_metrics()}").classes('text-sm text-gray-700')
+
+# === Search handler ===
+def run_search(payroll, periods, anomaly, start_date, end_date, division, center, changes=False, profile=False):
+    """
+    Runs the filter chain, the dashboard and the pay period trend; runs in a worker thread.
+    The dashboard and the trend come from one count over the (start, end) pay periods of the trend.
+    changes=True returns the changes since the last review instead of every anomaly;
+    profile=True captures this search with the profiler.
+    """
+    with stage('search', profile=profile) as record:
+        if changes:
+            df = payroll.filter_changes(anomaly, start_date, end_date, division, center)
+        else:
+            df = payroll.filter_cost_centers(anomaly, start_date, end_date, division, center)
+        cube = payroll.anomaly_cube(periods)
+        if (start_date, end_date) in periods:
+            super_dash = cube.dashboard(periods.index((start_date, end_date)))
+        else:
+            super_dash = payroll.create_dashboard(start_date, end_date)
+        trend = cube.trend(division)
+        record.rows_out = count_rows((df, super_dash, trend))
+    return df, super_dash, trend
+
+# === Repeat offenders ===
+@instrument('rollup')
+def run_rollup(payroll, history, n, anomaly, division):
+    """
+    Ranks the employees with the longest anomaly streaks over the last history pay periods;
+    runs in a worker thread.
+    """
+    return payroll.top_offenders(payroll.calendar.periods(history), n, anomaly, division)
+
+# === Page ===
+@ui.page('/')
+async def index(client):
+    """
+    One page per connected client: its selections, last search and tables are its own,
+    while the data and the result caches are shared.
+    """
+    # Bumped on every search, so the results of a superseded search are dropped
+    search_generation = {'value': 0}
+    # Filters and anomaly rows of the last search, reused by the download
+    last_search = {'key': None, 'df': None, 'payroll': None}
+    # Show only what changed since the pay period was last marked reviewed
+    show_changes = {'value': False}
+
+    # === UI Header with logo ===
+    with ui.header().classes('justify-center').props('height-hint=100'):
+        with ui.tabs():
+            try:
+                image_path = resource_path('BrewsterTwo.png')
+                if not os.path.exists(image_path):
+                    raise FileNotFoundError(f"Image not found at: {image_path}")
+                ui.image(image_path).classes('w-64')
+            except Exception as e:
+                ui.label(f"Failed to load logo: {e}").classes("text-red-500 text-sm")
+
+    # The pay_period_id picked in the dropdown; filled in with the newest once the data has loaded
+    selected_period = {'value': None}
+
+    def on_division_change(e):
+        selected_division.update({'value': e.value})
+        if data['payroll'] is None:
+            return
+
+        # Precomputed per division, so switching is a dictionary lookup
+        cost_center_select.options = ['All'] + [name for _, name in data['payroll'].get_cost_centers(e.value)]
+        cost_center_select.value = 'All'
+        cost_center_select.update()
+
+    def show_data():
+        """
+        Fills the dropdowns that come from the data and enables the buttons.
+        """
+        if data['error'] is not None:
+            loading_spinner.visible = False
+            loading_label.text = f"Failed to load payroll data: {data['error']}"
+            loading_label.classes('text-red-700')
+            return
+
+        payroll = data['payroll']
+        # The dropdowns that come from the data's pay periods, the rules, the divisions and the installed writers
+        period_select.options = payroll.calendar.options(PERIOD_OPTIONS)
+        if selected_period['value'] is None:
+            period_select.value = payroll.calendar.recent(1)[0]
+        period_select.update()
+        anomaly_select.options = ['All'] + payroll.anomalies
+        anomaly_select.update()
+        division_select.options = ['All'] + payroll.division_index.names
+        division_select.update()
+        format_select.options = data['formats']
+        format_select.update()
+
+        cost_center_select.options = ['All'] + [name for _, name in payroll.get_cost_centers(get_division())]
+        cost_center_select.update()
+        loading_row.visible = False
+        search_button.enable()
+        download_button.enable()
+        review_button.enable()
+        rank_button.enable()
+
+    def on_new_data():
+        """
+        After a refresh: a page still showing the load error gets everything, the others
+        the pay periods of the new data.
+        """
+        if loading_row.visible:
+            show_data()
+            return
+        calendar = data['payroll'].calendar
+        period_select.options = calendar.options(PERIOD_OPTIONS)
+        if period_select.value not in period_select.options:
+            period_select.value = calendar.recent(1)[0]
+        period_select.update()
+
+    async def on_download_click():
+        start_date, end_date = data['payroll'].calendar.period(get_selected_period())
+        dates = f'{start_date} - {end_date}'
+        anomaly = get_filter()
+        division = get_division()
+        center = get_center()
+        fmt = selected_format['value']
+        # On the server the file goes to the browser, through a temporary folder
+        folder = tempfile.mkdtemp(prefix='payroll_') if settings['server'] else None
+
+        download_button.disable()
+        ui.notify(f'Writing {fmt} report for {dates}...')
+        try:
+            full_path = await run.io_bound(
+                write_report, data['payroll'], last_search, anomaly, start_date, end_date, division, center, fmt,
+                folder, show_changes['value']
+            )
+            if full_path is not None and folder is not None:
+                content = await run.io_bound(read_file, full_path)
+                ui.download.content(content, os.path.basename(full_path))
+        except Exception as e:
+            ui.notify(f'Export failed: {e}', type='negative')
+            return
+        finally:
+            download_button.enable()
+            # Removed whether the report was written, empty or failed
+            if folder is not None:
+                shutil.rmtree(folder, ignore_errors=True)
+
+        if full_path is None:
+            ui.notify("No data to export", type="warning")
+        elif folder is None:
+            ui.notify(f'Report saved at: {full_path}', type='positive')
+        refresh_diagnostics(diagnostics_container)
+
+    async def on_review_click():
+        start_date, end_date = data['payroll'].calendar.period(get_selected_period())
+        dates = f'{start_date} - {end_date}'
+
+        review_button.disable()
+        try:
+            reviewed_at = await run.io_bound(data['payroll'].mark_reviewed, start_date, end_date)
+        except Exception as e:
+            ui.notify(f'Could not save the review: {e}', type='negative')
+            return
+        finally:
+            review_button.enable()
+
+        ui.notify(f'{dates} marked reviewed at {reviewed_at:%H:%M}', type='positive')
+        # The changes view is empty now; show it so
+        if show_changes['value']:
+            await on_search_click()
+
+    async def on_rank_click():
+        history = history_select.value
+        n = int(top_input.value or 20)
+        anomaly = get_filter()
+        division = get_division()
+
+        show_loading(offenders_container, f'Ranking employees over {HISTORY_PERIODS[history].lower()}...')
+        rank_button.disable()
+        try:
+            top = await run.io_bound(run_rollup, data['payroll'], history, n, anomaly, division)
+        except Exception as e:
+            offenders_container.clear()
+            ui.notify(f'Ranking failed: {e}', type='negative')
+            return
+        finally:
+            rank_button.enable()
+
+        offenders_container.clear()
+        with offenders_container:
+            if top.empty:
+                ui.label("No anomalies in these pay periods.").classes("text-gray-700 font-semibold")
+            else:
+                ui.table.from_pandas(top.round({'excess_hours': 2})).classes(
+                    'w-full max-h-[60vh] overflow-auto'
+                ).props('striped bordered hoverable dense wrap-cells')
+        refresh_diagnostics(diagnostics_container)
+
+    async def on_search_click():
+        anomaly = get_filter()
+        division = get_division()
+        center = get_center()
+        changes = show_changes['value']
+        # The search runs on one data load, even if a refresh swaps it meanwhile (days before
+        # its window are still read from the disk cache and the database, see load_history)
+        payroll = data['payroll']
+        start_date, end_date = payroll.calendar.period(get_selected_period())
+        dates = f'{start_date} - {end_date}'
+        trend_periods = payroll.calendar.periods(TREND_PERIODS)
+
+        search_generation['value'] += 1
+        generation = search_generation['value']
+
+        show_loading(table_container, f'Searching {dates}...')
+        dashboard_container.clear()
+
+        # Get data
+        try:
+            df, super_dash, trend = await run.io_bound(
+                run_search, payroll, trend_periods, anomaly, start_date, end_date, division, center, changes,
+                profile_checkbox.value
+            )
+        except Exception as e:
+            # Older pay periods are read from the database, which may be unreachable
+            if generation == search_generation['value']:
+                table_container.clear()
+                ui.notify(f'Search failed: {e}', type='negative')
+            return
+
+        # A newer search was started while this one ran: its results win
+        if generation != search_generation['value']:
+            return
+
+        last_search.update({'key': (anomaly, start_date, end_date, division, center, changes), 'df': df, 'payroll': payroll})
+
+        # Cleanup
+        table_container.clear()
+        dashboard_container.clear()
+
+        # === Anomaly Table ===
+        with stage('render', rows_in=len(df) if df is not None else 0), table_container:
+            if changes:
+                reviewed_at = payroll.last_reviewed(start_date, end_date)
+                review_text = f"reviewed {reviewed_at:%Y-%m-%d %H:%M}" if reviewed_at is not None else "never reviewed"
+            if df is not None and not df.empty:
+                # Not inplace: df is shared with the result cache. 'id' stays as the hidden row key
+                df = df.drop(columns=['earning_code_id', 'discrepancy', 'scheduled_start', 'scheduled_end'], errors='ignore')
+                title = f"Changes since last review ({review_text})" if changes else "Anomaly Data"
+                ui.label(title).classes("text-lg font-semibold mb-2")
+                render_anomaly_table(df)
+            elif changes:
+                ui.label(f"No changes since the last review ({review_text}).").classes("text-gray-700 font-semibold")
+            else:
+                ui.label("No anomalies found for this pay period.").classes("text-red-700 font-semibold")
+
+            # === Dashboard Table ===
+            with dashboard_container:
+                if super_dash is not None and not super_dash.empty:
+                    ui.label("Dashboard Summary").classes("text-lg font-semibold mt-6 mb-2")
+
+                    # Make sure anomaly names (index) show up as a column
+                    super_dash_display = super_dash.reset_index().rename(columns={'index': 'Anomaly'})
+
+                    ui.table.from_pandas(super_dash_display).classes(
+                        'w-full max-h-[60vh] overflow-auto'
+                    ).props('striped bordered hoverable dense wrap-cells')
+                else:
+                    ui.label("No dashboard summary data available.").classes("text-gray-700 font-semibold")
+
+                # === Pay period trend ===
+                title = "Pay Period Trend" if division == 'All' else f"Pay Period Trend ({division})"
+                ui.label(title).classes("text-lg font-semibold mt-6 mb-2")
+                trend_display = trend.reset_index().rename(columns={'index': 'Anomaly'})
+                ui.table.from_pandas(trend_display).classes(
+                    'w-full overflow-auto'
+                ).props('striped bordered hoverable dense wrap-cells')
+
+        # The capture is one-shot
+        profile_checkbox.set_value(False)
+        mark('first_search')
+        refresh_diagnostics(diagnostics_container)
+
+    # === UI layout ===
+    with ui.column().classes('w-full p-4 gap-4'):
+        with ui.row().classes('w-full justify-between items-center'):
+            # === Pay Period Dropdown ===
+            # {pay_period_id: label}, filled in from the data once it has loaded
+            ui.label('Pay Period').classes('text-sm font-semibold')
+            period_select = ui.select(
+                options={},
+                value=selected_period['value'],
+                with_input=True,
+                on_change=lambda e: selected_period.update({'value': e.value})
+            ).classes('w-60')
+
+            # === Anomaly Dropdown ===
+            # Filled in from the anomaly rules once the data has loaded
+            anomalies = ['All']
+            selected_anomaly = {'value': anomalies[0]}
+            ui.label('Anomaly').classes('text-sm font-semibold')
+            anomaly_select = ui.select(
+                options=anomalies,
+                value=selected_anomaly['value'],
+                with_input=True,
+                on_change=lambda e: selected_anomaly.update({'value': e.value})
+            ).classes('w-60')
+
+            # === Division Dropwdown ===
+            # Filled in from the divisions once the data has loaded
+            division_names = ['All']
+            selected_division = {'value': division_names[0]}
+            ui.label('Division').classes('text-sm font-semibold')
+            division_select = ui.select(
+                options=division_names,
+                value=selected_division['value'],
+                with_input=True,
+                on_change=on_division_change
+            ).classes('w-60')
+
+                    # === Cost Center Dropdown ===
+            # Filled in from the data once it has loaded
+            cost_center_options = ['All']
+
+            selected_cost_center = {'value': cost_center_options[0]}
+
+            ui.label('Cost Center').classes('text-sm font-semibold')
+            cost_center_select = ui.select(
+                options=cost_center_options,
+                value=selected_cost_center['value'],
+                with_input=True,
+                on_change=lambda e: selected_cost_center.update({'value': e.value})
+            ).classes('w-60')
+
+
+            # === Download format ===
+            # xlsx is added once the data load has checked for an Excel writer
+            formats = ['csv']
+            selected_format = {'value': formats[0]}
+            ui.label('Format').classes('text-sm font-semibold')
+            format_select = ui.select(
+                options=formats,
+                value=selected_format['value'],
+                on_change=lambda e: selected_format.update({'value': e.value})
+            ).classes('w-28')
+
+            # === Changes since last review ===
+            ui.checkbox(
+                'Changes since last review',
+                on_change=lambda e: show_changes.update({'value': e.value})
+            )
+
+            # === Buttons ===
+            # Disabled until the data has loaded
+            download_button = ui.button('Download', on_click=on_download_click).classes('w-40')
+            search_button = ui.button("Search", on_click=on_search_click).classes('w-40')
+            review_button = ui.button('Mark reviewed', on_click=on_review_click).classes('w-40')
+            download_button.disable()
+            search_button.disable()
+            review_button.disable()
+
+        # === Loading state ===
+        with ui.row().classes('items-center gap-2') as loading_row:
+            loading_spinner = ui.spinner(size='lg')
+            loading_label = ui.label('Loading payroll data...').classes('text-gray-700')
+
+        table_container = ui.column().classes('w-full h-full')
+        dashboard_container = ui.column().classes('w-full h-full')
+
+        # === Repeat offenders ===
+        # Per employee and anomaly over many pay periods, for the selected anomaly and division
+        with ui.expansion('Repeat offenders').classes('w-full'):
+            with ui.row().classes('items-center gap-4'):
+                history_select = ui.select(options=HISTORY_PERIODS, value=5, label='History').classes('w-48')
+                top_input = ui.number('Top', value=20, min=1, max=500, precision=0).classes('w-24')
+                rank_button = ui.button('Rank employees', on_click=on_rank_click)
+                rank_button.disable()
+            offenders_container = ui.column().classes('w-full')
+
+        # === Diagnostics ===
+        with ui.expansion('Diagnostics').classes('w-full'):
+            # Only this page's next search is profiled
+            profile_checkbox = ui.checkbox('Profile the next search')
+            diagnostics_container = ui.column().classes('w-full')
+
+
+
+
+        def get_selected_period():
+            return selected_period['value']
+
+        def get_filter():
+            return selected_anomaly['value']
+
+        def get_division():
+            return selected_division['value']
+
+        def get_center():
+            return selected_cost_center['value']
+
+    # The page is sent now; the dropdowns are filled once the shared data is there
+    await client.connected()
+    await data_ready.wait()
+    show_data()
+    data_listeners.add(on_new_data)
+    client.on_delete(lambda: data_listeners.discard(on_new_data))
+
+
+# === App launcher ===
+def parse_args():
+    parser = argparse.ArgumentParser(description="Brewster Finance payroll anomalies")
+    parser.add_argument("--server", action="store_true",
+                        help="serve every supervisor from one shared data load instead of a native window")
+    # The pages show names, hours and cost centers without a login, so only this machine is
+    # served unless another address (0.0.0.0 for every network) is asked for
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to serve on in server mode; 0.0.0.0 serves every network")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--refresh-minutes", type=float, default=REFRESH_MINUTES,
+                        help="minutes between database syncs in server mode")
+    # Ignore the arguments NiceGUI and PyInstaller pass along
+    args, _ = parser.parse_known_args()
+    return args
+
+if __name__ in {"__main__", "__mp_main__"}:
+    args = parse_args()
+    if args.server:
+        settings['server'] = True
+        app.timer(args.refresh_minutes * 60, refresh_data, immediate=False)
+        ui.run(host=args.host, port=args.port, title='Brewster Finance', show=False, reload=False)
+    else:
+        ui.run(native=True, title='Brewster Finance')